@@ -5,4 +5,13 @@ sudo nosetests test/test_partner.py
 nosetests test/test_server.py
 nosetests test/test_client.py
 nosetests test/test_util.py
+nosetests test/test_planner.py
+nosetests test/test_pool.py
+nosetests test/test_scheduler.py
+nosetests test/test_subscription.py
+nosetests test/test_codegen.py
+nosetests test/test_common.py
+nosetests test/test_instrumentation.py
+nosetests test/test_cache.py
+nosetests test/test_async_client.py
 
@@ -7,5 +7,12 @@ import snap7.error as error
 import snap7.snap7types as types
 import snap7.common as common
 import snap7.util as util
+import snap7.planner as planner
+import snap7.pool as pool
+import snap7.scheduler as scheduler
+import snap7.subscription as subscription
+import snap7.codegen as codegen
+import snap7.instrumentation as instrumentation
+import snap7.cache as cache
 
 __version__ = '0.5'
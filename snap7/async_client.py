@@ -0,0 +1,200 @@
+"""
+Snap7 client for asyncio, requires Python 3.5 or newer.
+
+The coroutines of the AsyncClient start an asynchronous snap7 job and wait
+for the completion callback of the library, so the event loop keeps running
+while the PLC answers. One process can service many PLCs concurrently this
+way, with one AsyncClient per PLC::
+
+    async def poll(address):
+        client = snap7.async_client.AsyncClient()
+        await client.connect(address, 0, 2)
+        data = await client.db_read(1, 0, 100)
+
+A snap7 client handle runs one job at a time, the coroutines of one
+AsyncClient wait for each other. Jobs are bounded by the RecvTimeout
+parameter of the client. A cancelled coroutine returns when its job is
+done, not before, as the library can't abort a job.
+"""
+import asyncio
+import logging
+from ctypes import byref, c_int
+
+import snap7
+from snap7.client import Client
+from snap7.common import check_error
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClient(object):
+    """
+    A snap7 client with coroutines for the data transfer functions.
+    """
+    def __init__(self, client=None):
+        """
+        :param client: the snap7.client.Client to use, a new one by default
+        """
+        self.client = client or Client()
+        self._lock = asyncio.Lock()
+        self._loop = None
+        self._future = None
+        self.client.set_as_callback(self._completion)
+
+    def _completion(self, op_code, op_result):
+        """
+        Called by the library thread when a job is done.
+        """
+        loop, future = self._loop, self._future
+        if future is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._set_result, future, op_result)
+        except RuntimeError:
+            logger.warning("job completed after the event loop was closed")
+
+    @staticmethod
+    def _set_result(future, op_result):
+        if not future.done():
+            future.set_result(op_result)
+
+    async def _run(self, job, *args):
+        """
+        Starts a job and waits for its completion.
+
+        :param job: a client function starting an asynchronous job
+        :returns: the return value of the job function
+        """
+        async with self._lock:
+            self._loop = asyncio.get_event_loop()
+            future = self._future = self._loop.create_future()
+            try:
+                value = job(*args)
+                result = await self._wait(future)
+            finally:
+                self._future = None
+            check_error(result, context="client")
+            return value
+
+    @staticmethod
+    async def _wait(future):
+        """
+        Waits for the completion of the running job.
+
+        A cancelled wait still lasts until the job is done, so the handle is
+        not released while the library writes into the buffer of the job,
+        and the completion can't be taken for the one of the next job.
+        """
+        cancelled = False
+        while True:
+            try:
+                result = await asyncio.shield(future)
+                break
+            except asyncio.CancelledError:
+                cancelled = True
+        if cancelled:
+            raise asyncio.CancelledError()
+        return result
+
+    async def connect(self, address, rack, slot, tcpport=102):
+        """
+        Connect to a S7 server, in the default executor of the event loop.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.client.connect, address, rack,
+                                   slot, tcpport)
+
+    def disconnect(self):
+        """
+        disconnect the client.
+        """
+        self.client.disconnect()
+
+    def destroy(self):
+        """
+        destroy the client.
+        """
+        return self.client.destroy()
+
+    async def db_read(self, db_number, start, size):
+        """Reads a part of a DB.
+
+        :returns: a bytearray with the data
+        """
+        data = bytearray(size)
+        await self.db_read_into(data, db_number, start, size)
+        return data
+
+    async def db_read_into(self, buffer, db_number, start, size=None,
+                           offset=0):
+        """Reads a part of a DB straight into a writable buffer.
+
+        :param offset: position in the buffer of the first byte to fill
+        :returns: the number of bytes read
+        """
+        return await self._run(self.client.as_db_read_into, buffer,
+                               db_number, start, size, offset)
+
+    async def db_write(self, db_number, start, data):
+        """Writes a bytearray into a DB.
+        """
+        await self._run(self._check, self.client.as_db_write, db_number,
+                        start, data)
+
+    async def read_area(self, area, dbnumber, start, size):
+        """Reads data from a PLC area.
+
+        :returns: a bytearray with the data
+        """
+        data = bytearray(size)
+        await self.read_area_into(data, area, dbnumber, start, size)
+        return data
+
+    async def read_area_into(self, buffer, area, dbnumber, start, size=None,
+                             offset=0):
+        """Reads data from a PLC area straight into a writable buffer.
+
+        :param offset: position in the buffer of the first byte to fill
+        :returns: the number of bytes read
+        """
+        return await self._run(self.client.as_read_area_into, buffer, area,
+                               dbnumber, start, size, offset)
+
+    async def write_area(self, area, dbnumber, start, data):
+        """Writes a bytearray into a PLC area.
+        """
+        await self._run(self.client.as_write_area, area, dbnumber, start,
+                        data)
+
+    async def ab_read(self, start, size):
+        """Reads PLC process outputs.
+
+        :returns: a bytearray with the data
+        """
+        data = bytearray(size)
+        await self._run(self.client.as_ab_read_into, data, start, size)
+        return data
+
+    async def ab_write(self, start, data):
+        """Writes PLC process outputs.
+        """
+        await self._run(self._check, self.client.as_ab_write, start, data)
+
+    async def db_get(self, db_number):
+        """Uploads a DB from AG.
+
+        :returns: a bytearray with the data
+        """
+        _buffer = snap7.snap7types.buffer_type()
+        size = c_int(snap7.snap7types.buffer_size)
+        await self._run(self._check, self.client.library.Cli_AsDBGet,
+                        self.client.pointer, db_number, byref(_buffer),
+                        byref(size))
+        return bytearray(_buffer)[:size.value]
+
+    @staticmethod
+    def _check(job, *args):
+        """
+        Runs a job function that returns an error code.
+        """
+        check_error(job(*args), context="client")
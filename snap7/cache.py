@@ -0,0 +1,167 @@
+"""
+A client side cache of PLC reads.
+
+Services that ask one PLC for the same data within a few milliseconds of
+each other can share the reads through the cache of a client::
+
+    cache = client.enable_cache(ttl=0.05, ttls={S7AreaPE: 0.01})
+
+    client.db_read(1, 0, 100)   # read from the PLC
+    client.db_read(1, 10, 20)   # served from the cached 0..100 range
+
+    client.disable_cache()
+
+Client.db_read() and Client.read_area() look up the (area, dbnumber, start,
+size) range first, a cached range holding the requested one is sliced.
+Results are copies, changing them does not change the cache.
+
+A cached range is used for its area's time to live, and dropped as soon as a
+write through the same client overlaps it. Writes of other clients or of the
+PLC program are not seen until the entry expires, so keep the time to live
+below the age of data the application accepts.
+
+The cache holds at most ``max_bytes`` of data, the least recently used ranges
+are evicted first.
+"""
+from collections import OrderedDict
+import logging
+import threading
+from timeit import default_timer
+
+from snap7.snap7types import S7AreaDB
+
+logger = logging.getLogger(__name__)
+
+
+class ReadCache(object):
+    """
+    Cached ranges of PLC areas with a time to live and LRU eviction.
+    """
+    def __init__(self, ttl=0.1, ttls=None, max_bytes=1 << 20):
+        """
+        :param ttl: seconds a read stays valid
+        :param ttls: a dict with the time to live per area, overrides ttl,
+                     0 disables caching for an area
+        :param max_bytes: the maximum number of cached bytes
+        """
+        assert max_bytes > 0, 'cache size should be positive'
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # (area, dbnumber, start, size) -> (expires, data), oldest use first
+        self._entries = OrderedDict()
+        # (area, dbnumber) -> set of cached keys, for the range lookups
+        self._ranges = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _block(area, dbnumber):
+        # the db number only selects a block in the DB area
+        return area, (dbnumber if area == S7AreaDB else 0)
+
+    def _find(self, block, start, size, now):
+        """
+        :returns: the key of a live entry holding the range, or None
+        """
+        key = block + (start, size)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                return key
+            self._remove(key)
+        end = start + size
+        for key in [k for k in self._ranges.get(block, ())
+                    if k[2] <= start and k[2] + k[3] >= end]:
+            if self._entries[key][0] > now:
+                return key
+            self._remove(key)
+        return None
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.size -= key[3]
+        keys = self._ranges[key[:2]]
+        keys.discard(key)
+        if not keys:
+            del self._ranges[key[:2]]
+
+    def get(self, area, dbnumber, start, size):
+        """
+        :returns: a bytearray with the cached data of a range, or None
+        """
+        block = self._block(area, dbnumber)
+        with self._lock:
+            key = self._find(block, start, size, default_timer())
+            if key is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # move to the end, the most recently used
+            entry = self._entries[key] = self._entries.pop(key)
+        data = entry[1]
+        offset = start - key[2]
+        return bytearray(data[offset:offset + size])
+
+    def put(self, area, dbnumber, start, data):
+        """
+        Caches the data read from a range.
+        """
+        ttl = self.ttls.get(area, self.ttl)
+        size = len(data)
+        if ttl <= 0 or not 0 < size <= self.max_bytes:
+            return
+        block = self._block(area, dbnumber)
+        key = block + (start, size)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = default_timer() + ttl, bytes(data)
+            self._ranges.setdefault(block, set()).add(key)
+            self.size += size
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                logger.debug("evicting %s", oldest)
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, area, dbnumber, start=0, size=None):
+        """
+        Drops the cached ranges overlapping a range.
+
+        :param size: number of bytes, None for the rest of the area
+        """
+        block = self._block(area, dbnumber)
+        with self._lock:
+            keys = self._ranges.get(block)
+            if not keys:
+                return
+            end = None if size is None else start + size
+            for key in [k for k in keys if k[2] + k[3] > start and
+                        (end is None or k[2] < end)]:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ranges.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        :returns: a dict with the hit, miss, eviction and invalidation counts
+                  and the number of cached entries and bytes
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self._entries),
+            'bytes': self.size,
+        }
@@ -1,9 +1,10 @@
 """
 Snap7 client used for connection to a siemens7 server.
 """
+from collections import deque, OrderedDict
 import re
 from ctypes import c_int, c_char_p, byref, sizeof, c_uint16, c_int32, c_byte
-from ctypes import c_void_p
+from ctypes import c_void_p, c_uint8, cast, POINTER, CFUNCTYPE
 
 import logging
 
@@ -11,13 +12,51 @@ import snap7
 from snap7 import six
 from snap7.snap7types import S7Object, buffer_type, buffer_size, BlocksList
 from snap7.snap7types import TS7BlockInfo, param_types, cpu_statuses, TS7Protection, TS7OrderCode
+from snap7.snap7types import S7DataItem, S7AreaDB, S7AreaPA
+from snap7.planner import ReadPlan, plan_writes, max_read_piece
 
+from snap7.cache import ReadCache
 from snap7.common import check_error, load_library, ipv4
+from snap7.instrumentation import Instrumentation
 from snap7.snap7exceptions import Snap7Exception
 
 logger = logging.getLogger(__name__)
 
 
+# return values of Cli_CheckAsCompletion
+job_complete = 0
+job_pending = 1
+
+# result of Cli_WaitAsCompletion when the wait expired before the job
+job_timeout = 0x02000000
+
+
+def byte_buffer(buffer, size=None, offset=0):
+    """
+    Wraps a writable buffer (bytearray, memoryview, numpy array, mmap, ...) in
+    a ctypes byte array that shares its memory, so the library can write
+    straight into it. Python 2 can't share the memory of a memoryview, use
+    an offset into the underlying buffer instead.
+
+    :param size: number of bytes to use, defaults to the rest of the buffer
+    :param offset: position in the buffer of the first byte to use
+    :returns: a tuple with the ctypes array and its size
+    """
+    if six.PY2:
+        # ctypes of python 2 only shares the memory of old style buffers
+        if isinstance(buffer, memoryview):
+            raise TypeError("can't read into a memoryview on python 2, pass "
+                            "the underlying buffer and an offset")
+        if size is None:
+            size = getattr(buffer, 'nbytes', None) or \
+                len(buffer) * getattr(buffer, 'itemsize', 1)
+            size -= offset
+    elif size is None:
+        size = memoryview(buffer).nbytes - offset
+    type_ = snap7.snap7types.wordlen_to_ctypes[snap7.snap7types.S7WLByte]
+    return (type_ * size).from_buffer(buffer, offset), size
+
+
 def error_wrap(func):
     """Parses a s7 error code returned the decorated function."""
     def f(*args, **kw):
@@ -30,17 +69,37 @@ class Client(object):
     """
     A snap7 client
     """
-    def __init__(self):
+    def __init__(self, fast=False):
+        """
+        :param fast: start in fast mode, see set_fast_mode()
+        """
         self.library = load_library()
         self.pointer = False
+        self._as_callback = None
+        self.instrumentation = None
+        self.cache = None
+        # negotiated PDU length of the connection, see get_pdu_length()
+        self._pdu_length = None
+        self.set_fast_mode(fast)
         self.create()
 
+    def set_fast_mode(self, fast=True):
+        """
+        In fast mode the data transfer functions skip their argument checks
+        and debug logging.
+
+        Outside fast mode whether the debug messages are logged is looked up
+        once, call this again after changing the level of the snap7.client
+        logger.
+        """
+        self.fast = fast
+        self._debug = not fast and logger.isEnabledFor(logging.DEBUG)
+
     def create(self):
         """
         create a SNAP7 client.
         """
         logger.info("creating snap7 client")
-        self.library.Cli_Create.restype = c_void_p
         self.pointer = S7Object(self.library.Cli_Create())
 
     def destroy(self):
@@ -86,7 +145,7 @@ class Client(object):
         if not status_string:
             raise Snap7Exception("The cpu state (%s) is invalid" % state.value)
         
-        logging.debug("CPU state is %s" % status_string)
+        logger.debug("CPU state is %s", status_string)
         return status_string
 
     def get_order_code(self):
@@ -117,6 +176,7 @@ class Client(object):
         disconnect a client.
         """
         logger.info("disconnecting snap7 client")
+        self._pdu_length = None
         return self.library.Cli_Disconnect(self.pointer)
 
     @error_wrap
@@ -128,10 +188,11 @@ class Client(object):
         :param rack: rack on server
         :param slot: slot on server.
         """
-        logger.info("connecting to %s:%s rack %s slot %s" % (address, tcpport,
-                                                             rack, slot))
+        logger.info("connecting to %s:%s rack %s slot %s", address, tcpport,
+                    rack, slot)
 
         self.set_param(snap7.snap7types.RemotePort, tcpport)
+        self._pdu_length = None
         return self.library.Cli_ConnectTo(
             self.pointer, c_char_p(six.b(address)),
             c_int(rack), c_int(slot))
@@ -141,16 +202,34 @@ class Client(object):
 
         :returns: user buffer.
         """
-        logger.debug("db_read, db_number:%s, start:%s, size:%s" %
-                     (db_number, start, size))
+        cache = self.cache
+        if cache is not None:
+            data = cache.get(S7AreaDB, db_number, start, size)
+            if data is not None:
+                return data
+        data = bytearray(size)
+        self.db_read_into(data, db_number, start, size)
+        if cache is not None:
+            cache.put(S7AreaDB, db_number, start, data)
+        return data
 
-        type_ = snap7.snap7types.wordlen_to_ctypes[snap7.snap7types.S7WLByte]
-        data = (type_ * size)()
-        result = (self.library.Cli_DBRead(
-            self.pointer, db_number, start, size,
-            byref(data)))
+    def db_read_into(self, buffer, db_number, start, size=None, offset=0):
+        """Reads a part of a DB straight into a writable buffer.
+
+        :param buffer: bytearray, memoryview, numpy array, mmap, ...
+        :param size: number of bytes to read, defaults to the rest of the
+                     buffer
+        :param offset: position in the buffer of the first byte to fill
+        :returns: the number of bytes read
+        """
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("db_read, db_number:%s, start:%s, size:%s", db_number,
+                         start, size)
+        result = self.library.Cli_DBRead(self.pointer, db_number, start, size,
+                                         byref(cdata))
         check_error(result, context="client")
-        return bytearray(data)
+        return size
 
     @error_wrap
     def db_write(self, db_number, start, data):
@@ -164,8 +243,11 @@ class Client(object):
         type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
         size = len(data)
         cdata = (type_ * size).from_buffer(data)
-        logger.debug("db_write db_number:%s start:%s size:%s data:%s" %
-                     (db_number, start, size, data))
+        if self._debug:
+            logger.debug("db_write db_number:%s start:%s size:%s data:%s",
+                         db_number, start, size, data)
+        if self.cache is not None:
+            self.cache.invalidate(S7AreaDB, db_number, start, size)
         return self.library.Cli_DBWrite(self.pointer, db_number, start, size,
                                         byref(cdata))
 
@@ -192,7 +274,7 @@ class Client(object):
 
         :param data: bytearray
         """
-        logger.debug("db_upload block_num: %s" % (block_num))
+        logger.debug("db_upload block_num: %s", block_num)
 
         block_type = snap7.snap7types.block_types['DB']
         _buffer = buffer_type()
@@ -202,7 +284,7 @@ class Client(object):
                                          byref(_buffer), byref(size))
 
         check_error(result, context="client")
-        logger.info('received %s bytes' % size)
+        logger.info('received %s bytes', size)
         return bytearray(_buffer)
 
     @error_wrap
@@ -225,7 +307,7 @@ class Client(object):
     def db_get(self, db_number):
         """Uploads a DB from AG.
         """
-        logging.debug("db_get db_number: %s" % db_number)
+        logger.debug("db_get db_number: %s", db_number)
         _buffer = buffer_type()
         result = self.library.Cli_DBGet(
             self.pointer, db_number, byref(_buffer),
@@ -241,16 +323,113 @@ class Client(object):
         :param start: offset to start writing
         :param size: number of units to read
         """
-        assert area in snap7.snap7types.areas.values()
+        cache = self.cache
+        if cache is not None:
+            data = cache.get(area, dbnumber, start, size)
+            if data is not None:
+                return data
+        data = bytearray(size)
+        self.read_area_into(data, area, dbnumber, start, size)
+        if cache is not None:
+            cache.put(area, dbnumber, start, data)
+        return data
+
+    def read_area_into(self, buffer, area, dbnumber, start, size=None,
+                       offset=0):
+        """Reads data from a PLC area straight into a writable buffer.
+
+        :param buffer: bytearray, memoryview, numpy array, mmap, ...
+        :param dbnumber: The DB number, only used when area= S7AreaDB
+        :param start: offset to start reading
+        :param size: number of bytes to read, defaults to the rest of the
+                     buffer
+        :param offset: position in the buffer of the first byte to fill
+        :returns: the number of bytes read
+        """
+        if not self.fast:
+            assert area in snap7.snap7types.areas.values()
         wordlen = snap7.snap7types.S7WLByte
-        type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
-        logging.debug("reading area: %s dbnumber: %s start: %s: amount %s: "
-                      "wordlen: %s" % (area, dbnumber, start, size, wordlen))
-        data = (type_ * size)()
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("reading area: %s dbnumber: %s start: %s: amount %s: "
+                         "wordlen: %s", area, dbnumber, start, size, wordlen)
         result = self.library.Cli_ReadArea(self.pointer, area, dbnumber, start,
-                                           size, wordlen, byref(data))
+                                           size, wordlen, byref(cdata))
         check_error(result, context="client")
-        return bytearray(data)
+        return size
+
+    def read_area_chunked(self, area, dbnumber, start, size, chunk_size=None,
+                          clients=()):
+        """Reads a large range from the PLC in PDU sized jobs, with several
+        jobs in flight.
+
+        A snap7 client handle runs one job at a time, so Cli_ReadArea()
+        sends the PDU sized pieces of a big read one after the other. This
+        splits the range on the python side and keeps an asynchronous job
+        running on this client and on every extra client, each writing
+        straight into its slice of one preallocated buffer. The extra
+        clients must be connected to the same PLC, for instance leased with
+        snap7.pool.ClientPool.lease_many().
+
+        :param dbnumber: The DB number, only used when area= S7AreaDB
+        :param start: offset to start reading
+        :param size: number of bytes to read
+        :param chunk_size: maximum bytes per job, defaults to the PDU payload
+        :param clients: extra connected clients to run jobs on
+        :returns: a bytearray with all the data
+        """
+        if not self.fast:
+            assert area in snap7.snap7types.areas.values()
+        if chunk_size is None:
+            chunk_size = max_read_piece(self.get_pdu_length())
+        assert chunk_size > 0, 'chunk size should be positive'
+        wordlen = snap7.snap7types.S7WLByte
+        if self._debug:
+            logger.debug("reading area %s dbnumber %s start %s size %s in jobs"
+                         " of %s bytes on %s handles", area, dbnumber, start,
+                         size, chunk_size, len(clients) + 1)
+        data = bytearray(size)
+        chunks = deque(range(0, size, chunk_size))
+        # client -> ctypes array of the running job, keeps it alive
+        running = OrderedDict()
+        error = 0
+
+        def submit(client):
+            offset = chunks.popleft()
+            cdata, amount = byte_buffer(data, min(chunk_size, size - offset),
+                                        offset)
+            result = client.library.Cli_AsReadArea(
+                client.pointer, area, dbnumber, start + offset, amount,
+                wordlen, byref(cdata))
+            if not result:
+                running[client] = cdata
+            return result
+
+        for client in (self,) + tuple(clients):
+            if not chunks:
+                break
+            error = submit(client)
+            if error:
+                break
+        while running:
+            client, _ = running.popitem(last=False)
+            result = client._wait_job()
+            error = error or result
+            if chunks and not error:
+                error = submit(client)
+        check_error(error, context="client")
+        return data
+
+    def db_read_chunked(self, db_number, start, size, chunk_size=None,
+                        clients=()):
+        """Reads a large part of a DB in PDU sized jobs.
+
+        See read_area_chunked().
+
+        :returns: a bytearray with all the data
+        """
+        return self.read_area_chunked(snap7.snap7types.S7AreaDB, db_number,
+                                      start, size, chunk_size, clients)
 
     @error_wrap
     def write_area(self, area, dbnumber, start, data):
@@ -266,9 +445,12 @@ class Client(object):
         wordlen = snap7.snap7types.S7WLByte
         type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
         size = len(data)
-        logging.debug("writing area: %s dbnumber: %s start: %s: size %s: "
-                      "type: %s" % (area, dbnumber, start, size, type_))
+        if self._debug:
+            logger.debug("writing area: %s dbnumber: %s start: %s: size %s: "
+                         "type: %s", area, dbnumber, start, size, type_)
         cdata = (type_ * len(data)).from_buffer(data)
+        if self.cache is not None:
+            self.cache.invalidate(area, dbnumber, start, size)
         return self.library.Cli_WriteArea(self.pointer, area, dbnumber, start,
                                           size, wordlen, byref(cdata))
 
@@ -283,16 +465,126 @@ class Client(object):
         check_error(result, context="client")
         return result, items
 
+    def read_plan(self, plan):
+        """Executes a snap7.planner.ReadPlan.
+
+        Every item reads straight into the buffer of its range, the tags are
+        sliced out of the ranges without copying. On python 2 indexing a
+        memoryview gives a str, so the tags are bytearray copies there.
+
+        :returns: a list with a memoryview (bytearray on python 2) for every
+                  tag of the plan
+        """
+        buffers = [bytearray(span.size) for span in plan.spans]
+        for request in plan.requests:
+            items = (S7DataItem * len(request))()
+            for item, piece in zip(items, request):
+                cdata, _ = byte_buffer(buffers[piece.tag], piece.size,
+                                       piece.offset)
+                item.Area = piece.area
+                item.WordLen = snap7.snap7types.S7WLByte
+                item.DBNumber = piece.dbnumber
+                item.Start = piece.start
+                item.Amount = piece.size
+                item.pData = cast(cdata, POINTER(c_uint8))
+            self.read_multi_vars(items)
+            for item in items:
+                check_error(item.Result, context="client")
+        if six.PY2:
+            views = buffers
+        else:
+            views = [memoryview(buffer) for buffer in buffers]
+        return [views[span][offset:offset + tag.size] for tag, (span, offset)
+                in zip(plan.tags, plan.locations)]
+
+    def read_tags(self, tags, max_gap=0):
+        """Reads a list of tags with as few multi variable requests as
+        possible.
+
+        Tags closer than ``max_gap`` bytes are merged into one range, the
+        ranges are packed into requests that fit the negotiated PDU. See
+        snap7.planner.ReadPlan, which can be used directly to reuse a plan.
+
+        :param tags: a list of (area, dbnumber, start, size) tuples
+        :param max_gap: the biggest gap in bytes to read along
+        :returns: a list with a memoryview (bytearray on python 2) for every
+                  tag
+        """
+        plan = ReadPlan(tags, self.get_pdu_length(), max_gap)
+        if self._debug:
+            logger.debug("%s", plan)
+        return self.read_plan(plan)
+
+    def write_multi_vars(self, items):
+        """This function writes multiple variables into the PLC.
+
+        The result of every write is stored in the Result field of its item.
+
+        :param items: list of S7DataItem objects
+        :returns: a tuple with the return code and a list of data items
+        """
+        if self.cache is not None:
+            for item in items:
+                self._invalidate_item(item)
+        result = self.library.Cli_WriteMultiVars(self.pointer, byref(items),
+                                                 c_int32(len(items)))
+        check_error(result, context="client")
+        return result, items
+
+    def _invalidate_item(self, item):
+        """Drops the cached reads a multi variable write item overlaps."""
+        wordlen = item.WordLen
+        if wordlen == snap7.snap7types.S7WLBit:
+            # the start of a bit is its bit address
+            start, size = item.Start // 8, 1
+        elif wordlen == snap7.snap7types.S7WLByte:
+            start, size = item.Start, item.Amount
+        else:
+            # other word lengths count elements, drop the whole block
+            start, size = 0, None
+        self.cache.invalidate(item.Area, item.DBNumber, start, size)
+
+    def write_tags(self, tags):
+        """Writes a list of values with as few multi variable requests as
+        possible.
+
+        The writes are packed into requests that fit the negotiated PDU by
+        snap7.planner.plan_writes(), values bigger than a PDU are split over
+        several items.
+
+        :param tags: a list of (area, dbnumber, start, data) tuples, data is a
+                     bytearray
+        :returns: a list with the result code of every write, 0 if it
+                  succeeded. Pass a code to check_error() to raise.
+        """
+        results = [0] * len(tags)
+        for request in plan_writes(tags, self.get_pdu_length()):
+            items = (S7DataItem * len(request))()
+            for item, piece in zip(items, request):
+                cdata, _ = byte_buffer(tags[piece.tag][3], piece.size,
+                                       piece.offset)
+                item.Area = piece.area
+                item.WordLen = snap7.snap7types.S7WLByte
+                item.DBNumber = piece.dbnumber
+                item.Start = piece.start
+                item.Amount = piece.size
+                item.pData = cast(cdata, POINTER(c_uint8))
+            self.write_multi_vars(items)
+            for item, piece in zip(items, request):
+                if item.Result and not results[piece.tag]:
+                    results[piece.tag] = item.Result
+        return results
+
     def list_blocks(self):
         """Returns the AG blocks amount divided by type.
 
         :returns: a snap7.types.BlocksList object.
         """
-        logging.debug("listing blocks")
+        logger.debug("listing blocks")
         blocksList = BlocksList()
         result = self.library.Cli_ListBlocks(self.pointer, byref(blocksList))
         check_error(result, context="client")
-        logging.debug("blocks: %s" % blocksList)
+        logger.debug("blocks: %s", blocksList)
         return blocksList
 
     def list_blocks_of_type(self, blocktype, size):
@@ -303,8 +595,7 @@ class Client(object):
         if not blocktype:
             raise Snap7Exception("The blocktype parameter was invalid")
 
-        logging.debug("listing blocks of type: %s size: %s" %
-                      (blocktype, size))
+        logger.debug("listing blocks of type: %s size: %s", blocktype, size)
 
         data = (c_int * 10)()
         count = c_int(size)
@@ -313,7 +604,7 @@ class Client(object):
             byref(data),
             byref(count))
 
-        logging.debug("number of items found: %s" % count)
+        logger.debug("number of items found: %s", count)
 
         check_error(result, context="client")
         return data
@@ -326,8 +617,8 @@ class Client(object):
         if not blocktype:
             raise Snap7Exception("The blocktype parameter was invalid")
 
-        logging.debug("retrieving block info for block %s of type %s" %
-                      (db_number, blocktype))
+        logger.debug("retrieving block info for block %s of type %s",
+                     db_number, blocktype)
 
         data = TS7BlockInfo()
 
@@ -368,10 +659,11 @@ class Client(object):
         :param local_tsap: Local TSAP (PC TSAP)
         :param remote_tsap: Remote TSAP (PLC TSAP)
         """
-        assert re.match(ipv4, address), '%s is invalid ipv4' % address
-        result = self.library.Cli_SetConnectionParams(self.pointer, address,
-                                                      c_uint16(local_tsap),
-                                                      c_uint16(remote_tsap))
+        if not self.fast:
+            assert re.match(ipv4, address), '%s is invalid ipv4' % address
+        result = self.library.Cli_SetConnectionParams(
+            self.pointer, c_char_p(six.b(address)), c_uint16(local_tsap),
+            c_uint16(remote_tsap))
         if result != 0:
             raise Snap7Exception("The parameter was invalid")
 
@@ -402,14 +694,26 @@ class Client(object):
         """
         This is a lean function of Cli_ReadArea() to read PLC process outputs.
         """
-        wordlen = snap7.snap7types.S7WLByte
-        type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
-        data = (type_ * size)()
-        logging.debug("ab_read: start: %s: size %s: " % (start, size))
+        data = bytearray(size)
+        self.ab_read_into(data, start, size)
+        return data
+
+    def ab_read_into(self, buffer, start, size=None, offset=0):
+        """
+        Reads PLC process outputs straight into a writable buffer.
+
+        :param size: number of bytes to read, defaults to the rest of the
+                     buffer
+        :param offset: position in the buffer of the first byte to fill
+        :returns: the number of bytes read
+        """
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("ab_read: start: %s: size %s: ", start, size)
         result = self.library.Cli_ABRead(self.pointer, start, size,
-                                         byref(data))
+                                         byref(cdata))
         check_error(result, context="client")
-        return bytearray(data)
+        return size
 
     def ab_write(self, start, data):
         """
@@ -420,22 +724,38 @@ class Client(object):
         type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
         size = len(data)
         cdata = (type_ * size).from_buffer(data)
-        logging.debug("ab write: start: %s: size: %s: " % (start, size))
+        if self._debug:
+            logger.debug("ab write: start: %s: size: %s: ", start, size)
+        if self.cache is not None:
+            self.cache.invalidate(S7AreaPA, 0, start, size)
         return self.library.Cli_ABWrite(
             self.pointer, start, size, byref(cdata))
 
     def as_ab_read(self, start, size):
         """
         This is the asynchronous counterpart of client.ab_read().
+
+        :returns: the buffer the job fills, valid once the job is complete.
         """
-        wordlen = snap7.snap7types.S7WLByte
-        type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
-        data = (type_ * size)()
-        logging.debug("ab_read: start: %s: size %s: " % (start, size))
+        data = bytearray(size)
+        self.as_ab_read_into(data, start, size)
+        return data
+
+    def as_ab_read_into(self, buffer, start, size=None, offset=0):
+        """
+        This is the asynchronous counterpart of client.ab_read_into(). The
+        buffer is filled when the job completes, so keep it alive (and don't
+        resize it) until then.
+
+        :returns: the number of bytes requested
+        """
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("ab_read: start: %s: size %s: ", start, size)
         result = self.library.Cli_AsABRead(self.pointer, start, size,
-                                           byref(data))
+                                           byref(cdata))
         check_error(result, context="client")
-        return bytearray(data)
+        return size
 
     def as_ab_write(self, start, data):
         """
@@ -445,10 +765,116 @@ class Client(object):
         type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
         size = len(data)
         cdata = (type_ * size).from_buffer(data)
-        logging.debug("ab write: start: %s: size: %s: " % (start, size))
+        if self._debug:
+            logger.debug("ab write: start: %s: size: %s: ", start, size)
+        if self.cache is not None:
+            self.cache.invalidate(S7AreaPA, 0, start, size)
         return self.library.Cli_AsABWrite(
             self.pointer, start, size, byref(cdata))
 
+    def as_read_area_into(self, buffer, area, dbnumber, start, size=None,
+                          offset=0):
+        """
+        This is the asynchronous counterpart of client.read_area_into(). The
+        buffer is filled when the job completes, so keep it alive (and don't
+        resize it) until then.
+
+        :returns: the number of bytes requested
+        """
+        if not self.fast:
+            assert area in snap7.snap7types.areas.values()
+        wordlen = snap7.snap7types.S7WLByte
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("reading area: %s dbnumber: %s start: %s: amount %s: "
+                         "wordlen: %s", area, dbnumber, start, size, wordlen)
+        result = self.library.Cli_AsReadArea(self.pointer, area, dbnumber,
+                                             start, size, wordlen,
+                                             byref(cdata))
+        check_error(result, context="client")
+        return size
+
+    @error_wrap
+    def as_write_area(self, area, dbnumber, start, data):
+        """
+        This is the asynchronous counterpart of client.write_area(). Keep the
+        data alive until the job completes.
+        """
+        wordlen = snap7.snap7types.S7WLByte
+        cdata, size = byte_buffer(data, len(data))
+        if self._debug:
+            logger.debug("writing area: %s dbnumber: %s start: %s: size %s",
+                         area, dbnumber, start, size)
+        if self.cache is not None:
+            self.cache.invalidate(area, dbnumber, start, size)
+        return self.library.Cli_AsWriteArea(self.pointer, area, dbnumber,
+                                            start, size, wordlen,
+                                            byref(cdata))
+
+    def _wait_job(self):
+        """
+        Waits as long as it takes for the running asynchronous job.
+
+        :returns: the result code of the job
+        """
+        while True:
+            result = self.library.Cli_WaitAsCompletion(self.pointer,
+                                                       c_int(1000))
+            if result != job_timeout:
+                return result
+
+    def check_as_completion(self):
+        """
+        Checks if the current asynchronous job is done, without waiting.
+
+        :returns: a tuple with a boolean that is True when the job is done
+                  and the result code of the job
+        """
+        result = c_int32()
+        code = self.library.Cli_CheckAsCompletion(self.pointer,
+                                                  byref(result))
+        if code not in (job_complete, job_pending):
+            raise Snap7Exception("checking the job failed (%s)" % code)
+        return code == job_complete, result.value
+
+    @error_wrap
+    def wait_as_completion(self, timeout):
+        """
+        Waits until the current asynchronous job is done or the timeout
+        expires. Raises if the job failed or timed out.
+
+        :param timeout: maximum time to wait (ms)
+        """
+        return self.library.Cli_WaitAsCompletion(self.pointer,
+                                                 c_int(timeout))
+
+    @error_wrap
+    def set_as_callback(self, call_back):
+        """
+        Sets the user callback that the library calls when an asynchronous
+        job is done. The callback runs in a library thread.
+
+        :param call_back: a function that accepts the operation code and the
+                          result code of the job.
+        """
+        logger.info("setting asynchronous completion callback")
+        callback_wrap = CFUNCTYPE(None, c_void_p, c_int, c_int)
+
+        def wrapper(usrptr, op_code, op_result):
+            """
+            Wraps python function into a ctypes function
+
+            :param usrptr: not used
+            :param op_code: the kind of job that is done
+            :param op_result: the result code of the job
+            """
+            call_back(op_code, op_result)
+
+        self._as_callback = callback_wrap(wrapper)
+        usrPtr = c_void_p()
+        return self.library.Cli_SetAsCallback(self.pointer, self._as_callback,
+                                              usrPtr)
+
     @error_wrap
     def as_compress(self, time):
         """
@@ -484,7 +910,7 @@ class Client(object):
         """
         This is the asynchronous counterpart of Cli_DBGet.
         """
-        logging.debug("db_get db_number: %s" % db_number)
+        logger.debug("db_get db_number: %s", db_number)
         _buffer = buffer_type()
         result = self.library.Cli_AsDBGet(self.pointer, db_number,
                                           byref(_buffer),
@@ -496,17 +922,28 @@ class Client(object):
         """
         This is the asynchronous counterpart of Cli_DBRead.
 
-        :returns: user buffer.
+        :returns: user buffer, filled once the job is complete.
+        """
+        data = bytearray(size)
+        self.as_db_read_into(data, db_number, start, size)
+        return data
+
+    def as_db_read_into(self, buffer, db_number, start, size=None, offset=0):
         """
-        logger.debug("db_read, db_number:%s, start:%s, size:%s" %
-                     (db_number, start, size))
+        This is the asynchronous counterpart of client.db_read_into(). The
+        buffer is filled when the job completes, so keep it alive (and don't
+        resize it) until then.
 
-        type_ = snap7.snap7types.wordlen_to_ctypes[snap7.snap7types.S7WLByte]
-        data = (type_ * size)()
-        result = (self.library.Cli_AsDBRead(self.pointer, db_number, start,
-                                            size,  byref(data)))
+        :returns: the number of bytes requested
+        """
+        cdata, size = byte_buffer(buffer, size, offset)
+        if self._debug:
+            logger.debug("db_read, db_number:%s, start:%s, size:%s", db_number,
+                         start, size)
+        result = self.library.Cli_AsDBRead(self.pointer, db_number, start,
+                                           size, byref(cdata))
         check_error(result, context="client")
-        return bytearray(data)
+        return size
 
     def as_db_write(self, db_number, start, data):
         """
@@ -516,8 +953,11 @@ class Client(object):
         type_ = snap7.snap7types.wordlen_to_ctypes[wordlen]
         size = len(data)
         cdata = (type_ * size).from_buffer(data)
-        logger.debug("db_write db_number:%s start:%s size:%s data:%s" %
-                     (db_number, start, size, data))
+        if self._debug:
+            logger.debug("db_write db_number:%s start:%s size:%s data:%s",
+                         db_number, start, size, data)
+        if self.cache is not None:
+            self.cache.invalidate(S7AreaDB, db_number, start, size)
         return self.library.Cli_AsDBWrite(
             self.pointer, db_number, start, size,
             byref(cdata))
@@ -551,7 +991,7 @@ class Client(object):
     def set_param(self, number, value):
         """Sets an internal Server object parameter.
         """
-        logger.debug("setting param number %s to %s" % (number, value))
+        logger.debug("setting param number %s to %s", number, value)
         type_ = param_types[number]
         return self.library.Cli_SetParam(self.pointer, number,
                                          byref(type_(value)))
@@ -559,7 +999,7 @@ class Client(object):
     def get_param(self, number):
         """Reads an internal Client object parameter.
         """
-        logger.debug("retreiving param number %s" % number)
+        logger.debug("retreiving param number %s", number)
         type_ = param_types[number]
         value = type_()
         code = self.library.Cli_GetParam(self.pointer, c_int(number),
@@ -569,12 +1009,69 @@ class Client(object):
 
     def get_pdu_length(self):
         """
-        Returns info about the PDU length.
+        Returns the PDU length negotiated with the PLC. It is asked once per
+        connection, the planned reads and writes use it on every call.
         """
-        logger.info("getting PDU length")
+        if self._pdu_length:
+            return self._pdu_length
+        if self._debug:
+            logger.debug("getting PDU length")
         requested_ = c_uint16()
         negotiated_ = c_uint16()
-        code = self.library.Cli_GetPduLength(self.pointer, byref(requested_), byref(negotiated_))
+        code = self.library.Cli_GetPduLength(self.pointer, byref(requested_),
+                                             byref(negotiated_))
         check_error(code)
+        self._pdu_length = negotiated_.value
+        return self._pdu_length
 
-        return negotiated_.value
+    def get_exec_time(self):
+        """
+        Returns the time (ms) the library took for the last job.
+        """
+        time = c_int()
+        code = self.library.Cli_GetExecTime(self.pointer, byref(time))
+        check_error(code, context="client")
+        return time.value
+
+    def instrument(self, exec_time=True):
+        """
+        Starts recording per method statistics of the data transfer calls,
+        see snap7.instrumentation.
+
+        :param exec_time: also record the library execution time of every
+                          synchronous job, one extra library call per job
+        :returns: the snap7.instrumentation.Instrumentation with the stats
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(exec_time)
+            self.instrumentation.install(self)
+        return self.instrumentation
+
+    def enable_cache(self, ttl=0.1, ttls=None, max_bytes=1 << 20):
+        """
+        Caches the results of db_read() and read_area(), see snap7.cache.
+
+        :param ttl: seconds a read stays valid
+        :param ttls: a dict with the time to live per area, overrides ttl
+        :param max_bytes: the maximum number of cached bytes
+        :returns: the snap7.cache.ReadCache, with the hit and miss counters
+        """
+        self.cache = ReadCache(ttl, ttls, max_bytes)
+        return self.cache
+
+    def disable_cache(self):
+        """
+        Stops caching reads and drops the cached data.
+        """
+        self.cache = None
+
+    def uninstrument(self):
+        """
+        Stops recording statistics, the plain methods are used again.
+
+        :returns: the Instrumentation with the recorded stats, or None
+        """
+        instrumentation, self.instrumentation = self.instrumentation, None
+        if instrumentation is not None:
+            instrumentation.uninstall(self)
+        return instrumentation
@@ -0,0 +1,211 @@
+"""
+Typed accessor classes generated from DB layout specifications.
+
+A layout specification (see snap7.util.Layout) is turned into the source of
+a class with a property per field. Every property reads or writes its field
+at a fixed offset with a precompiled struct, without looking at the
+specification again::
+
+    RcIf = snap7.codegen.accessor(rc_if_db_1_layout, 'RcIf')
+
+    row = RcIf(db._bytearray, offset=4 + 126 * 3 - 4)
+    if row.AutAct:
+        row.RC_IF_NAME = 'valve'
+
+Field names that are not python names get their other characters replaced
+by underscores, ``ScaleOut.High`` becomes ``row.ScaleOut_High``.
+
+The offset of an accessor is the bytearray index of layout byte 0, that is
+the ``db_offset - layout_offset`` of the row. accessor() compiles the class
+once per specification and caches it. source() returns the generated code,
+to be saved as a module::
+
+    with open('rc_if.py', 'w') as f:
+        f.write(snap7.codegen.source(rc_if_db_1_layout, 'RcIf'))
+"""
+import keyword
+import logging
+import re
+
+from snap7.util import Layout, type_formats
+
+logger = logging.getLogger(__name__)
+
+identifier = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# compiled accessor classes by (specification text, encoding, class name)
+_accessors = {}
+
+header = '''\
+# generated by snap7.codegen from a DB layout specification
+import struct
+
+from snap7.util import get_string
+
+'''
+
+class_header = '''
+
+class {name}(object):
+    """
+    Accessor of a DB row with the layout:
+{layout}
+    """
+    __slots__ = ('_data', '_offset')
+
+    # (field name, attribute name) of every field
+    fields = (
+{fields}
+    )
+
+    def __init__(self, data, offset=0):
+        """
+        :param data: the bytearray with the row
+        :param offset: the bytearray index of layout byte 0
+        """
+        self._data = data
+        self._offset = offset
+
+    def export(self):
+        """
+        export dictionary with values
+        """
+        return dict((name, getattr(self, attribute))
+                    for name, attribute in self.fields)
+'''
+
+templates = {
+    'BOOL': '''
+    @property
+    def {name}(self):
+        return self._data[self._offset + {byte_index}] & {mask} != 0
+
+    @{name}.setter
+    def {name}(self, value):
+        if value:
+            self._data[self._offset + {byte_index}] |= {mask}
+        else:
+            self._data[self._offset + {byte_index}] &= {inverse}
+''',
+    'STRING': '''
+    @property
+    def {name}(self):
+        return get_string(self._data, self._offset + {byte_index}, {max_size},
+                          {encoding!r})
+
+    @{name}.setter
+    def {name}(self, value):
+        if not isinstance(value, bytes):
+            value = value.encode({encoding!r})
+        size = len(value)
+        if size > {max_size}:
+            raise ValueError('{name}: size %s > max_size {max_size}' % size)
+        index = self._offset + {byte_index}
+        padding = max(min(self._data[index], {max_size}) - size, 0)
+        self._data[index + 1] = size
+        self._data[index + 2:index + 2 + size + padding] = (value +
+                                                            b' ' * padding)
+''',
+    'INT': '''
+    @property
+    def {name}(self):
+        return _unpack_INT(self._data, self._offset + {byte_index})[0]
+
+    @{name}.setter
+    def {name}(self, value):
+        _pack_INT(self._data, self._offset + {byte_index}, int(value))
+''',
+    'REAL': '''
+    @property
+    def {name}(self):
+        return _unpack_REAL(self._data, self._offset + {byte_index})[0]
+
+    @{name}.setter
+    def {name}(self, value):
+        _pack_REAL(self._data, self._offset + {byte_index}, float(value))
+''',
+}
+templates['DWORD'] = templates['INT'].replace('INT', 'DWORD')
+
+
+def attribute_name(name):
+    """
+    Returns the attribute name of a field: the field name with characters
+    that are not allowed in a python name replaced by underscores.
+    """
+    attribute = re.sub(r'\W', '_', name)
+    if not identifier.match(attribute):
+        attribute = '_' + attribute
+    if keyword.iskeyword(attribute):
+        attribute += '_'
+    return attribute
+
+
+def source(specification, class_name='Row'):
+    """
+    Generates the source of an accessor class.
+
+    :param specification: a layout specification text or snap7.util.Layout
+    :param class_name: the name of the generated class
+    :returns: the source of a module defining the class
+    """
+    layout = specification if isinstance(specification, Layout) \
+        else Layout(specification)
+    if not identifier.match(class_name) or keyword.iskeyword(class_name):
+        raise ValueError('%s is not a valid class name' % class_name)
+    attributes = [attribute_name(name) for name in layout.names]
+    if len(set(attributes)) < len(attributes):
+        raise ValueError('field names clash as attribute names: %s' %
+                         ', '.join(attributes))
+
+    lines = [header]
+    for _type in sorted(type_formats):
+        lines.append("_%s = struct.Struct('>%s')\n" %
+                     (_type, type_formats[_type]))
+        lines.append("_unpack_%s = _%s.unpack_from\n" % (_type, _type))
+        lines.append("_pack_%s = _%s.pack_into\n" % (_type, _type))
+
+    text = '\n'.join('    %-8s %-20s %s' % (field.index, field.name,
+                                             field.type)
+                     for field in layout.fields.values())
+    fields = '\n'.join('        (%r, %r),' % pair
+                       for pair in zip(layout.names, attributes))
+    lines.append(class_header.format(name=class_name, layout=text,
+                                     fields=fields))
+    for field, attribute in zip(layout.fields.values(), attributes):
+        if field.type == 'BOOL':
+            template = templates['BOOL']
+        elif field.max_size is not None:
+            template = templates['STRING']
+        else:
+            template = templates[field.type]
+        lines.append(template.format(name=attribute,
+                                     byte_index=field.byte_index,
+                                     mask=field.mask,
+                                     inverse=0xff ^ (field.mask or 0),
+                                     max_size=field.max_size,
+                                     encoding=layout.encoding))
+    return ''.join(lines)
+
+
+def accessor(specification, class_name='Row'):
+    """
+    Returns the accessor class of a layout, generated and compiled on first
+    use.
+
+    :param specification: a layout specification text or snap7.util.Layout
+    :param class_name: the name of the generated class
+    """
+    if isinstance(specification, Layout):
+        key = specification.text, specification.encoding, class_name
+    else:
+        key = specification, 'latin-1', class_name
+    cls = _accessors.get(key)
+    if cls is None:
+        code = source(specification, class_name)
+        logger.debug("compiling accessor %s", class_name)
+        namespace = {}
+        exec(compile(code, '<snap7.codegen %s>' % class_name, 'exec'),
+             namespace)
+        cls = _accessors[key] = namespace[class_name]
+    return cls
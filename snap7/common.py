@@ -1,7 +1,9 @@
 from ctypes import c_char
 from ctypes.util import find_library
 import logging
-from snap7.snap7exceptions import Snap7Exception
+from snap7 import error as errors
+from snap7.prototypes import bind
+from snap7.snap7exceptions import Snap7Exception, error_class
 
 import platform
 if platform.system() == 'Windows':
@@ -45,6 +47,22 @@ class Snap7Library(object):
             msg = "can't find snap7 library. If installed, try running ldconfig"
             raise Snap7Exception(msg)
         self.cdll = cdll.LoadLibrary(self.lib_location)
+        bind(self.cdll)
+
+
+# texts of the error codes by context, filled from the library on first use
+error_texts = {
+    "client": {},
+    "server": {},
+    "partner": {},
+}
+
+# names of the S7 and ISO TCP parts of the error codes, by context
+error_names = {
+    "client": errors.client_errors,
+    "server": errors.server_errors,
+    "partner": errors.isotcp_errors,
+}
 
 
 def load_library(lib_location=None):
@@ -62,7 +80,8 @@ def check_error(code, context="client"):
     if code:
         error = error_text(code, context)
         logger.error(error)
-        raise Snap7Exception(error)
+        raise error_class(code)(error, code, context,
+                                error_name(code, context))
 
 
 def error_text(error, context="client"):
@@ -73,7 +92,11 @@ def error_text(error, context="client"):
     :returns: the error string
     """
     assert context in ("client", "server", "partner")
-    logger.debug("error text for %s" % hex(error))
+    texts = error_texts[context]
+    cached = texts.get(error)
+    if cached is not None:
+        return cached
+    logger.debug("error text for %s", hex(error))
     len_ = 1024
     text_type = c_char * len_
     text = text_type()
@@ -84,4 +107,16 @@ def error_text(error, context="client"):
         library.Srv_ErrorText(error, text, len_)
     elif context == "partner":
         library.Par_ErrorText(error, text, len_)
+    texts[error] = text.value
     return text.value
+
+
+def error_name(error, context="client"):
+    """Returns the names of the S7 and ISO TCP errors in an error number,
+    as defined in snap7.error
+
+    :returns: the names joined by ' ', None if none is known
+    """
+    names = error_names[context]
+    parts = [names.get(error & mask) for mask in (0xfff00000, 0x000f0000)]
+    return ' '.join(part for part in parts if part) or None
@@ -1,9 +1,9 @@
 """
 Snap7 library error codes.
 
-we define all error codes here, but we don't use them (yet/anymore).
-The error code formatting of the snap7 library as already quite good,
-so we are using that now. But maybe we will use this in the future again.
+The error code formatting of the snap7 library is already quite good, so
+error messages come from the library. The names defined here are given to
+the exceptions raised by snap7.common.check_error().
 """
 
 s7_client_errors = {
@@ -90,7 +90,6 @@ class Partner(object):
         :param active: 0
         :returns: a pointer to the partner object
         """
-        self.library.Par_Create.restype = snap7.snap7types.S7Object
         self.pointer = snap7.snap7types.S7Object(self.library.Par_Create(int(active)))
 
     def destroy(self):
@@ -0,0 +1,240 @@
+"""
+Planning of multi variable requests.
+
+Cli_ReadMultiVars() and Cli_WriteMultiVars() handle up to 20 variables in one
+request, as long as the request and the answer both fit in the negotiated PDU.
+The functions in this module pack an arbitrary list of tags into as few of
+these requests as possible. Tags that are too big for a single PDU are split
+over several items.
+
+A tag is an (area, dbnumber, start, size) tuple, for example::
+
+    tags = [
+        (snap7.snap7types.S7AreaDB, 200, 16, 4),    # a REAL in DB200
+        (snap7.snap7types.S7AreaMK, 0, 10, 2),      # an INT in the merkers
+    ]
+
+    plan = snap7.planner.ReadPlan(tags, client.get_pdu_length(),
+                                  max_gap=snap7.planner.read_item_overhead)
+    print(plan)
+    values = client.read_plan(plan)
+
+Tags of the same area that are close to each other are merged into one range
+first, when reading the gap between them costs less than a separate item.
+"""
+from collections import namedtuple
+
+# maximum number of items in one multi variable request (MaxVars in snap7)
+max_vars = 20
+
+# sizes of the S7 headers of a multi variable read. The request has a fixed
+# header plus a fixed size per item, the answer has a fixed header plus a
+# header per item in front of the data. Item data is padded to an even size.
+read_request_header = 12
+read_request_item = 12
+read_answer_header = 14
+read_answer_item = 4
+
+# sizes of the S7 headers of a multi variable write. Every item has a header
+# in the parameters and one in front of its data. The fixed part includes the
+# 7 bytes snap7 keeps free in the PDU for the ISO headers when writing.
+write_request_header = 19
+write_request_item = 16
+
+# PDU bytes of a separate read item. Merging two tags with a gap up to this
+# size never makes the requests bigger.
+read_item_overhead = read_request_item + read_answer_item
+
+
+Tag = namedtuple('Tag', 'area dbnumber start size')
+
+# part of a tag read by one item of a request. ``tag`` is the index of the tag
+# in the planned list and ``offset`` the position of the data within the tag.
+Piece = namedtuple('Piece', 'tag area dbnumber start size offset')
+
+
+def read_item_cost(size):
+    """
+    Returns the number of answer PDU bytes taken by a read item of ``size``
+    bytes.
+    """
+    return read_answer_item + size + (size & 1)
+
+
+def write_item_cost(size):
+    """
+    Returns the number of request PDU bytes taken by a write item of ``size``
+    bytes.
+    """
+    return write_request_item + size + (size & 1)
+
+
+def max_read_piece(pdu_length):
+    """
+    Returns the largest amount of bytes a single read item can hold.
+    """
+    size = (pdu_length - read_answer_header - read_answer_item) & ~1
+    if size <= 0:
+        raise ValueError('PDU length %s is too small' % pdu_length)
+    return size
+
+
+def max_write_piece(pdu_length):
+    """
+    Returns the largest amount of bytes a single write item can hold.
+    """
+    size = (pdu_length - write_request_header - write_request_item) & ~1
+    if size <= 0:
+        raise ValueError('PDU length %s is too small' % pdu_length)
+    return size
+
+
+def max_read_items(pdu_length):
+    """
+    Returns the maximum number of items a read request can hold.
+    """
+    items = (pdu_length - read_request_header) // read_request_item
+    return min(max_vars, items)
+
+
+def split_tags(tags, piece_size):
+    """
+    Splits tags in pieces of at most ``piece_size`` bytes.
+
+    :returns: a list of Piece objects
+    """
+    pieces = []
+    for index, tag in enumerate(tags):
+        area, dbnumber, start, size = tag
+        if size <= 0:
+            raise ValueError('tag %s has an invalid size' % (tag,))
+        for offset in range(0, size, piece_size):
+            amount = min(piece_size, size - offset)
+            pieces.append(Piece(index, area, dbnumber, start + offset,
+                                amount, offset))
+    return pieces
+
+
+def pack(pieces, budget, items, cost):
+    """
+    Packs pieces into requests, first fit, biggest first, which keeps the
+    number of requests close to the minimum.
+
+    :param budget: PDU bytes available for the items of a request
+    :param items: maximum number of items in a request
+    :param cost: function returning the PDU bytes taken by an item
+    :returns: a list of requests, each a list of Piece objects
+    """
+    pieces = sorted(pieces, key=lambda piece: piece.size, reverse=True)
+    requests = []
+    space = []
+    for piece in pieces:
+        piece_cost = cost(piece.size)
+        for i, request in enumerate(requests):
+            if len(request) < items and space[i] >= piece_cost:
+                request.append(piece)
+                space[i] -= piece_cost
+                break
+        else:
+            requests.append([piece])
+            space.append(budget - piece_cost)
+    return requests
+
+
+def plan_reads(tags, pdu_length):
+    """
+    Packs a list of tags into multi variable read requests.
+
+    :param tags: a list of (area, dbnumber, start, size) tuples
+    :param pdu_length: the negotiated PDU length
+    :returns: a list of requests, each a list of Piece objects
+    """
+    pieces = split_tags(tags, max_read_piece(pdu_length))
+    return pack(pieces, pdu_length - read_answer_header,
+                max_read_items(pdu_length), read_item_cost)
+
+
+def plan_writes(tags, pdu_length):
+    """
+    Packs a list of writes into multi variable write requests.
+
+    :param tags: a list of (area, dbnumber, start, data) tuples
+    :param pdu_length: the negotiated PDU length
+    :returns: a list of requests, each a list of Piece objects
+    """
+    sizes = [(area, dbnumber, start, len(data))
+             for area, dbnumber, start, data in tags]
+    pieces = split_tags(sizes, max_write_piece(pdu_length))
+    return pack(pieces, pdu_length - write_request_header, max_vars,
+                write_item_cost)
+
+
+def coalesce(tags, max_gap=0):
+    """
+    Merges tags of the same area and DB that are at most ``max_gap`` bytes
+    apart into one range. Adjacent and overlapping tags are always merged.
+
+    :param tags: a list of (area, dbnumber, start, size) tuples
+    :param max_gap: the biggest gap in bytes to read along
+    :returns: a tuple with the list of merged ranges and, for every tag, the
+              index of the range that holds it and the tag offset within it
+    """
+    order = sorted(range(len(tags)),
+                   key=lambda i: (tags[i][0], tags[i][1], tags[i][2]))
+    spans = []
+    locations = [None] * len(tags)
+    for i in order:
+        area, dbnumber, start, size = tags[i]
+        if spans:
+            span = spans[-1]
+            end = span[2] + span[3]
+            if span[0] == area and span[1] == dbnumber and \
+                    start - end <= max_gap:
+                span[3] = max(end, start + size) - span[2]
+                locations[i] = (len(spans) - 1, start - span[2])
+                continue
+        spans.append([area, dbnumber, start, size])
+        locations[i] = (len(spans) - 1, 0)
+    return [Tag(*span) for span in spans], locations
+
+
+class ReadPlan(object):
+    """
+    A plan to read a list of tags: the merged ranges that are read, the multi
+    variable requests that read them and where every tag is found.
+
+    A plan only depends on the tags and the PDU length, so it can be made
+    once and executed every poll cycle with Client.read_plan().
+    """
+    def __init__(self, tags, pdu_length, max_gap=0):
+        """
+        :param tags: a list of (area, dbnumber, start, size) tuples
+        :param pdu_length: the negotiated PDU length
+        :param max_gap: the biggest gap in bytes to read along, see coalesce()
+        """
+        self.tags = [Tag(*tag) for tag in tags]
+        self.pdu_length = pdu_length
+        self.max_gap = max_gap
+        self.spans, self.locations = coalesce(self.tags, max_gap)
+        self.requests = plan_reads(self.spans, pdu_length)
+
+    @property
+    def tag_bytes(self):
+        """number of bytes of all tags"""
+        return sum(tag.size for tag in self.tags)
+
+    @property
+    def read_bytes(self):
+        """number of bytes actually read, including gaps"""
+        return sum(span.size for span in self.spans)
+
+    @property
+    def items(self):
+        """number of items in all requests"""
+        return sum(len(request) for request in self.requests)
+
+    def __str__(self):
+        return "<read plan tags: %s ranges: %s items: %s requests: %s " \
+               "bytes: %s tag bytes: %s>" % (len(self.tags), len(self.spans),
+                                             self.items, len(self.requests),
+                                             self.read_bytes, self.tag_bytes)
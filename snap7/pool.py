@@ -0,0 +1,358 @@
+"""
+Sharing connected clients between threads.
+
+A PLC only accepts a limited number of PG/OP connections, and connecting is
+slow. A ClientPool keeps connected clients per endpoint, hands them out to
+threads and caps the number of handles per endpoint::
+
+    pool = snap7.pool.ClientPool(max_per_endpoint=2)
+
+    with pool.lease('192.168.0.1', 0, 2) as client:
+        data = client.db_read(1, 0, 100)
+
+    pool.close()
+
+A client that lost its connection is destroyed when it is returned or
+leased, and after a failed connect the endpoint is not retried for a while,
+so many threads can't start a reconnect storm after a network blip.
+
+A big read can keep a job in flight on every free handle of an endpoint::
+
+    with pool.lease_many('192.168.0.1', 0, 2, 4) as clients:
+        data = clients[0].db_read_chunked(1, 0, 65536, clients=clients[1:])
+
+A MultiPlcReader reads tags from many PLCs in parallel on a fixed set of
+worker threads, leasing the clients from a pool. The library releases the
+GIL while it waits for a PLC, so a poll of many PLCs takes about as long as
+the slowest one::
+
+    reader = snap7.pool.MultiPlcReader(workers=16)
+    jobs = [(('192.168.0.%s' % i, 0, 2), tags) for i in range(1, 100)]
+    for result in reader.read(jobs):
+        print(result.endpoint, result.elapsed, result.error)
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+import logging
+import threading
+import time
+from timeit import default_timer
+
+from snap7.client import Client
+from snap7.six.moves import queue
+from snap7.snap7exceptions import Snap7Exception
+
+logger = logging.getLogger(__name__)
+
+Endpoint = namedtuple('Endpoint', 'address rack slot connection_type tcpport')
+
+# the outcome of reading the tags of one PLC. ``values`` has a memoryview per
+# tag, or is None when reading failed with ``error``. ``elapsed`` is the time
+# in seconds the PLC took, including waiting for a connection.
+PlcResult = namedtuple('PlcResult', 'endpoint values error elapsed')
+
+
+def endpoint(address, rack, slot, connection_type=1, tcpport=102):
+    """
+    Returns the key of a PLC connection in a pool.
+
+    :param connection_type: 1 for PG, 2 for OP, 3 to 10 for S7 Basic
+    """
+    return Endpoint(address, rack, slot, connection_type, tcpport)
+
+
+class ClientPool(object):
+    """
+    A pool of connected clients, keyed by endpoint.
+    """
+    def __init__(self, max_per_endpoint=1, timeout=None, retry_interval=5.0,
+                 client_factory=Client):
+        """
+        :param max_per_endpoint: maximum number of handles per endpoint
+        :param timeout: default time (s) to wait for a free handle, None
+                        waits forever
+        :param retry_interval: time (s) after a failed connect during which
+                               the endpoint is not connected again
+        :param client_factory: creates the clients, snap7.client.Client
+        """
+        assert max_per_endpoint > 0, 'max_per_endpoint should be positive'
+        self.max_per_endpoint = max_per_endpoint
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.client_factory = client_factory
+        self._condition = threading.Condition()
+        self._idle = {}      # endpoint -> list of connected idle clients
+        self._handles = {}   # endpoint -> number of idle and leased clients
+        self._failed = {}    # endpoint -> time of the last failed connect
+        self._closed = False
+
+    def acquire(self, address, rack, slot, connection_type=1, tcpport=102,
+                timeout=None):
+        """
+        Leases a connected client, waits if the endpoint has no free handle.
+        Return it with release().
+
+        :param timeout: time (s) to wait for a free handle, defaults to the
+                        pool timeout
+        :returns: a connected snap7.client.Client
+        """
+        key = endpoint(address, rack, slot, connection_type, tcpport)
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.time() + timeout
+
+        while True:
+            client = self._take(key, deadline)
+            if client is None:
+                return self._connect(key)
+            if self._healthy(client):
+                return client
+            self._discard(key, client)
+
+    def release(self, client, address, rack, slot, connection_type=1,
+                tcpport=102, discard=False):
+        """
+        Returns a leased client to the pool.
+
+        :param discard: destroy the client instead of keeping it
+        """
+        key = endpoint(address, rack, slot, connection_type, tcpport)
+        if discard or self._closed or not self._healthy(client):
+            self._discard(key, client)
+            return
+        with self._condition:
+            self._idle.setdefault(key, []).append(client)
+            self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, address, rack, slot, connection_type=1, tcpport=102,
+              timeout=None):
+        """
+        Context manager leasing a connected client. A client that raised an
+        exception is only kept when it is still connected.
+        """
+        args = address, rack, slot, connection_type, tcpport
+        client = self.acquire(*args, timeout=timeout)
+        try:
+            yield client
+        finally:
+            self.release(client, *args)
+
+    @contextmanager
+    def lease_many(self, address, rack, slot, count, connection_type=1,
+                   tcpport=102, timeout=None):
+        """
+        Context manager leasing up to count connected clients of one
+        endpoint, to run several jobs at once. Waits for the first client
+        only, the others are the handles that are free right away. A failed
+        connect of one of the others only ends the list, the endpoint is not
+        held back for it.
+
+        :returns: a list with at least one client
+        """
+        args = address, rack, slot, connection_type, tcpport
+        key = endpoint(*args)
+        clients = [self.acquire(*args, timeout=timeout)]
+        try:
+            while len(clients) < count:
+                client = self._acquire_extra(key)
+                if client is None:
+                    break
+                clients.append(client)
+            yield clients
+        finally:
+            for client in clients:
+                self.release(client, *args)
+
+    def close(self):
+        """
+        Disconnects and destroys all idle clients. Leased clients are
+        destroyed when they are returned, new leases are refused.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, {}
+            for key, clients in idle.items():
+                self._handles[key] -= len(clients)
+            self._condition.notify_all()
+        for clients in idle.values():
+            for client in clients:
+                self._destroy(client)
+
+    def stats(self):
+        """
+        :returns: a dict with the number of handles and idle handles per
+                  endpoint
+        """
+        with self._condition:
+            return dict((key, {'handles': count,
+                               'idle': len(self._idle.get(key, ()))})
+                        for key, count in self._handles.items())
+
+    def _acquire_extra(self, key):
+        """
+        Leases a free client without waiting, or returns None.
+        """
+        while True:
+            try:
+                client = self._take(key, time.time())
+            except Snap7Exception:
+                return None
+            if client is None:
+                try:
+                    return self._connect(key, backoff=False)
+                except Exception:
+                    return None
+            if self._healthy(client):
+                return client
+            self._discard(key, client)
+
+    def _take(self, key, deadline):
+        """
+        Takes an idle client, or reserves a new handle and returns None.
+        """
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise Snap7Exception("the pool is closed")
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop()
+                if self._handles.get(key, 0) < self.max_per_endpoint:
+                    failed = self._failed.get(key)
+                    if failed and time.time() - failed < self.retry_interval:
+                        raise Snap7Exception("connecting to %s failed recently"
+                                             % (key,))
+                    self._handles[key] = self._handles.get(key, 0) + 1
+                    return None
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise Snap7Exception("no free connection to %s" %
+                                             (key,))
+                    self._condition.wait(remaining)
+
+    def _connect(self, key, backoff=True):
+        """
+        Creates and connects a client for a reserved handle.
+
+        :param backoff: hold the endpoint back after a failed connect
+        """
+        logger.info("connecting pool client to %s", key)
+        client = None
+        try:
+            client = self.client_factory()
+            client.set_connection_type(key.connection_type)
+            client.connect(key.address, key.rack, key.slot, key.tcpport)
+        except Exception:
+            if backoff:
+                with self._condition:
+                    self._failed[key] = time.time()
+            if client is not None:
+                self._discard(key, client)
+            else:
+                self._free(key)
+            raise
+        with self._condition:
+            self._failed.pop(key, None)
+        return client
+
+    def _healthy(self, client):
+        try:
+            return client.get_connected()
+        except Snap7Exception:
+            return False
+
+    def _discard(self, key, client):
+        logger.info("dropping pool client of %s", key)
+        self._destroy(client)
+        self._free(key)
+
+    def _free(self, key):
+        with self._condition:
+            self._handles[key] -= 1
+            self._condition.notify_all()
+
+    def _destroy(self, client):
+        try:
+            if self._healthy(client):
+                client.disconnect()
+        except Snap7Exception:
+            logger.warning("disconnecting pool client failed")
+        client.destroy()
+
+
+class MultiPlcReader(object):
+    """
+    Reads tags from many PLCs in parallel on a bounded set of threads.
+    """
+    def __init__(self, workers=8, pool=None):
+        """
+        :param workers: number of worker threads
+        :param pool: the ClientPool to lease clients from, a new pool with
+                     one handle per endpoint by default
+        """
+        assert workers > 0, 'workers should be positive'
+        self.pool = pool or ClientPool()
+        self._own_pool = pool is None
+        self._jobs = queue.Queue()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work,
+                                      name='snap7-reader-%s' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def read(self, jobs):
+        """
+        Reads the tags of every job, each job runs on a worker thread.
+
+        :param jobs: a list of (endpoint, tags) tuples. An endpoint is an
+                     (address, rack, slot[, connection_type[, tcpport]])
+                     tuple, tags is a list of (area, dbnumber, start, size)
+                     tuples as taken by Client.read_tags().
+        :returns: a list with a PlcResult for every job, in job order
+        """
+        results = [None] * len(jobs)
+        done = threading.Semaphore(0)
+        for index, (spec, tags) in enumerate(jobs):
+            self._jobs.put((index, endpoint(*spec), tags, results, done))
+        for _ in jobs:
+            done.acquire()
+        return results
+
+    def close(self):
+        """
+        Stops the worker threads, and closes the pool if the reader made it.
+        """
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._own_pool:
+            self.pool.close()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            index, key, tags, results, done = job
+            try:
+                results[index] = self._read(key, tags)
+            finally:
+                done.release()
+
+    def _read(self, key, tags):
+        start = default_timer()
+        try:
+            with self.pool.lease(*key) as client:
+                values = client.read_tags(tags)
+        except Exception as e:
+            logger.warning("reading from %s failed: %s", key, e)
+            return PlcResult(key, None, e, default_timer() - start)
+        return PlcResult(key, values, None, default_timer() - start)
@@ -0,0 +1,142 @@
+"""
+Prototypes of the snap7 library functions.
+
+The table below gives the result type and argument types of the library
+functions the wrappers call. bind() resolves every function once when the
+library is loaded and sets its ``restype`` and ``argtypes``, so ctypes
+converts and checks the arguments of a call without guessing, and later
+lookups of a function on the library are plain attribute hits.
+
+Handles are passed by value as ``S7Object`` and by reference (Cli_Destroy
+and friends) as ``c_void_p``, as are all buffers and result structures, so
+any ctypes buffer, structure or byref() is accepted where the library takes
+a pointer.
+
+Functions the wrappers call with arguments that don't match the library
+yet are left out of the table and keep the default ctypes conversion.
+"""
+import logging
+from ctypes import c_char_p, c_int, c_uint16, c_uint32, c_void_p
+
+logger = logging.getLogger(__name__)
+
+S7Object = c_void_p
+pointer = c_void_p
+word = c_uint16
+longword = c_uint32
+
+# name: (restype, argtypes)
+prototypes = {
+    # client administrative functions
+    'Cli_Create': (S7Object, ()),
+    'Cli_Destroy': (c_int, (pointer,)),
+    'Cli_ConnectTo': (c_int, (S7Object, c_char_p, c_int, c_int)),
+    'Cli_SetConnectionParams': (c_int, (S7Object, c_char_p, word, word)),
+    'Cli_SetConnectionType': (c_int, (S7Object, word)),
+    'Cli_Disconnect': (c_int, (S7Object,)),
+    'Cli_GetParam': (c_int, (S7Object, c_int, pointer)),
+    'Cli_SetParam': (c_int, (S7Object, c_int, pointer)),
+    'Cli_SetAsCallback': (c_int, (S7Object, pointer, pointer)),
+    # client data I/O
+    'Cli_ReadArea': (c_int, (S7Object, c_int, c_int, c_int, c_int, c_int,
+                             pointer)),
+    'Cli_WriteArea': (c_int, (S7Object, c_int, c_int, c_int, c_int, c_int,
+                              pointer)),
+    'Cli_ReadMultiVars': (c_int, (S7Object, pointer, c_int)),
+    'Cli_WriteMultiVars': (c_int, (S7Object, pointer, c_int)),
+    'Cli_DBRead': (c_int, (S7Object, c_int, c_int, c_int, pointer)),
+    'Cli_DBWrite': (c_int, (S7Object, c_int, c_int, c_int, pointer)),
+    'Cli_ABRead': (c_int, (S7Object, c_int, c_int, pointer)),
+    'Cli_ABWrite': (c_int, (S7Object, c_int, c_int, pointer)),
+    # client directory and block functions
+    'Cli_ListBlocks': (c_int, (S7Object, pointer)),
+    'Cli_ListBlocksOfType': (c_int, (S7Object, c_int, pointer, pointer)),
+    'Cli_GetAgBlockInfo': (c_int, (S7Object, c_int, c_int, pointer)),
+    'Cli_Upload': (c_int, (S7Object, c_int, c_int, pointer, pointer)),
+    'Cli_FullUpload': (c_int, (S7Object, c_int, c_int, pointer, pointer)),
+    'Cli_Download': (c_int, (S7Object, c_int, pointer, c_int)),
+    'Cli_DBGet': (c_int, (S7Object, c_int, pointer, pointer)),
+    # client control and info functions
+    'Cli_PlcStop': (c_int, (S7Object,)),
+    'Cli_PlcColdStart': (c_int, (S7Object,)),
+    'Cli_GetPlcStatus': (c_int, (S7Object, pointer)),
+    'Cli_GetOrderCode': (c_int, (S7Object, pointer)),
+    'Cli_GetCpuInfo': (c_int, (S7Object, pointer)),
+    'Cli_Compress': (c_int, (S7Object, c_int)),
+    'Cli_SetSessionPassword': (c_int, (S7Object, c_char_p)),
+    'Cli_ClearSessionPassword': (c_int, (S7Object,)),
+    'Cli_GetProtection': (c_int, (S7Object, pointer)),
+    'Cli_GetConnected': (c_int, (S7Object, pointer)),
+    'Cli_GetPduLength': (c_int, (S7Object, pointer, pointer)),
+    'Cli_GetExecTime': (c_int, (S7Object, pointer)),
+    'Cli_ErrorText': (c_int, (c_int, pointer, c_int)),
+    # client asynchronous functions
+    'Cli_AsReadArea': (c_int, (S7Object, c_int, c_int, c_int, c_int, c_int,
+                               pointer)),
+    'Cli_AsWriteArea': (c_int, (S7Object, c_int, c_int, c_int, c_int, c_int,
+                                pointer)),
+    'Cli_AsDBRead': (c_int, (S7Object, c_int, c_int, c_int, pointer)),
+    'Cli_AsDBWrite': (c_int, (S7Object, c_int, c_int, c_int, pointer)),
+    'Cli_AsABRead': (c_int, (S7Object, c_int, c_int, pointer)),
+    'Cli_AsABWrite': (c_int, (S7Object, c_int, c_int, pointer)),
+    'Cli_AsDBGet': (c_int, (S7Object, c_int, pointer, pointer)),
+    'Cli_AsDownload': (c_int, (S7Object, c_int, pointer, c_int)),
+    'Cli_AsCompress': (c_int, (S7Object, c_int)),
+    'Cli_CheckAsCompletion': (c_int, (S7Object, pointer)),
+    'Cli_WaitAsCompletion': (c_int, (S7Object, c_int)),
+    # server
+    'Srv_Create': (S7Object, ()),
+    'Srv_Destroy': (c_int, (pointer,)),
+    'Srv_Stop': (c_int, (S7Object,)),
+    'Srv_GetParam': (c_int, (S7Object, c_int, pointer)),
+    'Srv_SetParam': (c_int, (S7Object, c_int, pointer)),
+    'Srv_RegisterArea': (c_int, (S7Object, c_int, word, pointer, c_int)),
+    'Srv_UnregisterArea': (c_int, (S7Object, c_int, word)),
+    'Srv_LockArea': (c_int, (S7Object, c_int, word)),
+    'Srv_UnlockArea': (c_int, (S7Object, c_int, word)),
+    'Srv_GetStatus': (c_int, (S7Object, pointer, pointer, pointer)),
+    'Srv_SetCpuStatus': (c_int, (S7Object, c_int)),
+    'Srv_ClearEvents': (c_int, (S7Object,)),
+    'Srv_PickEvent': (c_int, (S7Object, pointer, pointer)),
+    'Srv_GetMask': (c_int, (S7Object, c_int, pointer)),
+    'Srv_SetMask': (c_int, (S7Object, c_int, longword)),
+    'Srv_SetEventsCallback': (c_int, (S7Object, pointer, pointer)),
+    'Srv_EventText': (c_int, (pointer, pointer, c_int)),
+    'Srv_ErrorText': (c_int, (c_int, pointer, c_int)),
+    # partner
+    'Par_Create': (S7Object, (c_int,)),
+    'Par_Destroy': (c_int, (pointer,)),
+    'Par_Start': (c_int, (S7Object,)),
+    'Par_Stop': (c_int, (S7Object,)),
+    'Par_GetParam': (c_int, (S7Object, c_int, pointer)),
+    'Par_SetParam': (c_int, (S7Object, c_int, pointer)),
+    'Par_CheckAsBSendCompletion': (c_int, (S7Object, pointer)),
+    'Par_WaitAsBSendCompletion': (c_int, (S7Object, longword)),
+    'Par_GetTimes': (c_int, (S7Object, pointer, pointer)),
+    'Par_GetStats': (c_int, (S7Object, pointer, pointer, pointer, pointer)),
+    'Par_GetLastError': (c_int, (S7Object, pointer)),
+    'Par_GetStatus': (c_int, (S7Object, pointer)),
+    'Par_ErrorText': (c_int, (c_int, pointer, c_int)),
+}
+
+
+def bind(library):
+    """
+    Sets the result and argument types of the functions in the prototype
+    table on a loaded library. Functions the library doesn't export are
+    skipped.
+
+    :param library: a ctypes cdll of the snap7 library
+    :returns: the names of the functions that were bound
+    """
+    bound = []
+    for name, (restype, argtypes) in prototypes.items():
+        try:
+            function = getattr(library, name)
+        except AttributeError:
+            logger.debug("snap7 library has no %s", name)
+            continue
+        function.restype = restype
+        function.argtypes = argtypes
+        bound.append(name)
+    return bound
@@ -0,0 +1,203 @@
+"""
+Cyclic polling of tags with different scan rates.
+
+Tags are grouped in scan classes by their interval. Every tick the poller
+reads the tags of all scan classes that are due with one read plan, so tags
+of classes that are due together share requests::
+
+    poller = snap7.scheduler.Poller(client)
+    poller.add('speed', (S7AreaDB, 1, 0, 4), interval=0.05)
+    poller.add('recipe', (S7AreaDB, 2, 0, 200), interval=5)
+
+    def on_values(values):
+        print(util.get_real(values['speed'], 0))
+
+    poller.run(on_values)      # blocks, poller.stop() from another thread
+
+Per scan class the poller tracks how late the reads start (jitter), how long
+they take and how many cycles were missed (overruns). Growing overruns mean
+the PLC link is saturated.
+"""
+from collections import OrderedDict
+import logging
+import threading
+from timeit import default_timer
+
+from snap7.planner import ReadPlan
+
+logger = logging.getLogger(__name__)
+
+
+class ScanClass(object):
+    """
+    The tags polled at one interval and the timing statistics of their reads.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.tags = OrderedDict()   # name -> (area, dbnumber, start, size)
+        self.next_due = None
+        self.cycles = 0
+        self.overruns = 0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def schedule(self, due, now):
+        """
+        Moves the deadline to the next cycle after ``now``, counting the
+        cycles that were missed.
+        """
+        missed = int((now - due) // self.interval)
+        if missed > 0:
+            self.overruns += missed
+        self.next_due = due + (max(missed, 0) + 1) * self.interval
+
+    def record(self, jitter, duration):
+        self.cycles += 1
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.total_jitter += jitter
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+
+    def stats(self):
+        """
+        :returns: a dict with the timing statistics, times in seconds
+        """
+        cycles = self.cycles or 1
+        return {
+            'interval': self.interval,
+            'tags': len(self.tags),
+            'cycles': self.cycles,
+            'overruns': self.overruns,
+            'max_jitter': self.max_jitter,
+            'mean_jitter': self.total_jitter / cycles,
+            'max_duration': self.max_duration,
+            'mean_duration': self.total_duration / cycles,
+        }
+
+
+class Poller(object):
+    """
+    Polls tags at per tag intervals with one client.
+    """
+    def __init__(self, client, max_gap=0):
+        """
+        :param client: a connected snap7.client.Client
+        :param max_gap: the biggest gap in bytes to read along when merging
+                        tags, see snap7.planner.coalesce()
+        """
+        self.client = client
+        self.max_gap = max_gap
+        self.classes = OrderedDict()   # interval -> ScanClass
+        self._plans = {}               # intervals polled together -> plan
+        self._stop = threading.Event()
+
+    def add(self, name, tag, interval):
+        """
+        Adds a tag to the scan class of its interval.
+
+        :param name: the name the value is reported with
+        :param tag: an (area, dbnumber, start, size) tuple
+        :param interval: scan interval in seconds
+        """
+        assert interval > 0, 'interval should be positive'
+        scan_class = self.classes.get(interval)
+        if scan_class is None:
+            scan_class = self.classes[interval] = ScanClass(interval)
+        scan_class.tags[name] = tuple(tag)
+        self._plans.clear()
+
+    def remove(self, name):
+        """
+        Removes a tag from the poller.
+        """
+        for interval, scan_class in list(self.classes.items()):
+            if scan_class.tags.pop(name, None) is not None:
+                if not scan_class.tags:
+                    del self.classes[interval]
+                self._plans.clear()
+                return
+        raise KeyError(name)
+
+    def due(self, now):
+        """
+        :returns: the scan classes with a deadline at or before ``now``
+        """
+        return [scan_class for scan_class in self.classes.values()
+                if scan_class.next_due is None or scan_class.next_due <= now]
+
+    def poll(self, now=None):
+        """
+        Reads the tags of all scan classes that are due, with one plan.
+
+        :returns: a dict with a memoryview for every tag that was read
+        """
+        if now is None:
+            now = default_timer()
+        due = self.due(now)
+        if not due:
+            return {}
+
+        key = tuple(scan_class.interval for scan_class in due)
+        entry = self._plans.get(key)
+        if entry is None:
+            names = [name for scan_class in due for name in scan_class.tags]
+            tags = [tag for scan_class in due
+                    for tag in scan_class.tags.values()]
+            plan = ReadPlan(tags, self.client.get_pdu_length(), self.max_gap)
+            logger.debug("planned scan classes %s: %s", key, plan)
+            entry = self._plans[key] = names, plan
+        names, plan = entry
+
+        started = default_timer()
+        values = self.client.read_plan(plan)
+        duration = default_timer() - started
+        for scan_class in due:
+            deadline = now if scan_class.next_due is None \
+                else scan_class.next_due
+            scan_class.record(now - deadline, duration)
+            scan_class.schedule(deadline, now + duration)
+        return dict(zip(names, values))
+
+    def next_deadline(self):
+        """
+        :returns: the earliest deadline of all scan classes
+        """
+        deadlines = [scan_class.next_due or 0
+                     for scan_class in self.classes.values()]
+        return min(deadlines) if deadlines else None
+
+    def run(self, callback):
+        """
+        Polls until stop() is called, passing the values of every tick to
+        the callback.
+
+        :param callback: a function that accepts a dict of tag values
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            values = self.poll()
+            if values:
+                callback(values)
+            deadline = self.next_deadline()
+            if deadline is None:
+                self._stop.wait(0.1)
+                continue
+            delay = deadline - default_timer()
+            if delay > 0:
+                self._stop.wait(delay)
+
+    def stop(self):
+        """
+        Stops run().
+        """
+        self._stop.set()
+
+    def stats(self):
+        """
+        :returns: a dict with the statistics of every scan class, keyed by
+                  interval
+        """
+        return dict((interval, scan_class.stats())
+                    for interval, scan_class in self.classes.items())
@@ -44,7 +44,7 @@ class Server(object):
         :param event: an PSrvEvent struct object
         :returns: the error string
         """
-        logger.debug("error text for %s" % hex(event.EvtCode))
+        logger.debug("error text for %s", hex(event.EvtCode))
         len_ = 1024
         text_type = ctypes.c_char * len_
         text = text_type()
@@ -61,7 +61,6 @@ class Server(object):
         create the server.
         """
         logger.info("creating server")
-        self.library.Srv_Create.restype = snap7.snap7types.S7Object
         self.pointer = snap7.snap7types.S7Object(self.library.Srv_Create())
 
     @error_wrap
@@ -70,8 +69,8 @@ class Server(object):
         visible by the clients.
         """
         size = ctypes.sizeof(userdata)
-        logger.info("registering area %s, index %s, size %s" % (area_code,
-                                                                index, size))
+        logger.info("registering area %s, index %s, size %s", area_code,
+                    index, size)
         size = ctypes.sizeof(userdata)
         return self.library.Srv_RegisterArea(self.pointer, area_code, index,
                                              ctypes.byref(userdata), size)
@@ -149,9 +148,9 @@ class Server(object):
         start the server.
         """
         if tcpport != 102:
-            logging.info("setting server TCP port to %s" % tcpport)
+            logger.info("setting server TCP port to %s", tcpport)
             self.set_param(snap7.snap7types.LocalPort, tcpport)
-        logger.info("starting server on 0.0.0.0:%s" % tcpport)
+        logger.info("starting server on 0.0.0.0:%s", tcpport)
         return self.library.Srv_Start(self.pointer)
 
     @error_wrap
@@ -183,9 +182,9 @@ class Server(object):
                                            ctypes.byref(cpu_status),
                                            ctypes.byref(clients_count))
         check_error(error)
-        logger.debug("status server %s cpu %s clients %s" %
-                     (server_status.value, cpu_status.value,
-                      clients_count.value))
+        logger.debug("status server %s cpu %s clients %s",
+                     server_status.value, cpu_status.value,
+                     clients_count.value)
         return snap7.snap7types.server_statuses[server_status.value], \
                snap7.snap7types.cpu_statuses[cpu_status.value], \
                clients_count.value
@@ -201,14 +200,14 @@ class Server(object):
     def unlock_area(self, code, index):
         """Unlocks a previously locked shared memory area.
         """
-        logging.debug("unlocking area code %s index %s" % (code, index))
+        logger.debug("unlocking area code %s index %s", code, index)
         return self.library.Srv_UnlockArea(self.pointer, code, index)
 
     @error_wrap
     def lock_area(self, code, index):
         """Locks a shared memory area.
         """
-        logging.debug("locking area code %s index %s" % (code, index))
+        logger.debug("locking area code %s index %s", code, index)
         return self.library.Srv_UnlockArea(self.pointer, code, index)
 
     @error_wrap
@@ -217,17 +216,17 @@ class Server(object):
         start server on a specific interface.
         """
         if tcpport != 102:
-            logging.info("setting server TCP port to %s" % tcpport)
+            logger.info("setting server TCP port to %s", tcpport)
             self.set_param(snap7.snap7types.LocalPort, tcpport)
         assert re.match(ipv4, ip), '%s is invalid ipv4' % ip
-        logger.info("starting server to %s:102" % ip)
+        logger.info("starting server to %s:102", ip)
         return self.library.Srv_Start(self.pointer, ip)
 
     @error_wrap
     def set_param(self, number, value):
         """Sets an internal Server object parameter.
         """
-        logger.debug("setting param number %s to %s" % (number, value))
+        logger.debug("setting param number %s to %s", number, value)
         return self.library.Srv_SetParam(self.pointer, number,
                                          ctypes.byref(ctypes.c_int(value)))
 
@@ -235,7 +234,7 @@ class Server(object):
     def set_mask(self, kind, mask):
         """Writes the specified filter mask.
         """
-        logger.debug("setting mask kind %s to %s" % (kind, mask))
+        logger.debug("setting mask kind %s to %s", kind, mask)
         return self.library.Srv_SetMask(self.pointer, kind, mask)
 
     @error_wrap
@@ -243,7 +242,7 @@ class Server(object):
         """Sets the Virtual CPU status.
         """
         assert status in snap7.snap7types.cpu_statuses, 'unknown cpu state %s' % status
-        logger.debug("setting cpu status to %s" % status)
+        logger.debug("setting cpu status to %s", status)
         return self.library.Srv_SetCpuStatus(self.pointer, status)
 
     def pick_event(self):
@@ -256,14 +255,14 @@ class Server(object):
                                           ctypes.byref(ready))
         check_error(code)
         if ready:
-            logger.debug("one event ready: %s" % event)
+            logger.debug("one event ready: %s", event)
             return event
         logger.debug("no events ready")
 
     def get_param(self, number):
         """Reads an internal Server object parameter.
         """
-        logger.debug("retreiving param number %s" % number)
+        logger.debug("retreiving param number %s", number)
         value = ctypes.c_int()
         code = self.library.Srv_GetParam(self.pointer, number,
                                          ctypes.byref(value))
@@ -273,7 +272,7 @@ class Server(object):
     def get_mask(self, kind):
         """Reads the specified filter mask.
         """
-        logger.debug("retrieving mask kind %s" % kind)
+        logger.debug("retrieving mask kind %s", kind)
         mask = snap7.snap7types.longword()
         code = self.library.Srv_GetMask(self.pointer, kind, ctypes.byref(mask))
         check_error(code)
@@ -2,4 +2,61 @@ class Snap7Exception(Exception):
     """
     A Snap7 specific exception.
     """
+    code = None
+
+
+class Snap7LibraryError(Snap7Exception):
+    """
+    An error code returned by the snap7 library. The code combines a
+    socket error (low 16 bits), an ISO TCP error (bits 16 to 19) and an S7
+    protocol error (bits 20 to 31).
+    """
+    def __init__(self, message, code, context="client", name=None):
+        super(Snap7LibraryError, self).__init__(message)
+        self.code = code
+        self.context = context
+        self.name = name
+
+    @property
+    def tcp_error(self):
+        return self.code & 0x0000ffff
+
+    @property
+    def iso_error(self):
+        return self.code & 0x000f0000
+
+    @property
+    def s7_error(self):
+        return self.code & 0xfff00000
+
+
+class TcpError(Snap7LibraryError):
+    """
+    A socket error, the connection to the partner is broken.
+    """
+    pass
+
+
+class IsoError(Snap7LibraryError):
+    """
+    An ISO TCP error, the connection or a packet is invalid.
+    """
+    pass
+
+
+class S7Error(Snap7LibraryError):
+    """
+    An S7 protocol error, the PLC or the library refused the function.
+    """
     pass
+
+
+def error_class(code):
+    """
+    :returns: the exception class of the most basic failure in a code
+    """
+    if code & 0x0000ffff:
+        return TcpError
+    if code & 0x000f0000:
+        return IsoError
+    return S7Error
@@ -0,0 +1,150 @@
+"""
+Change notifications on top of the poller.
+
+A subscription compares every new raw buffer of a tag with the previous one
+and only decodes the fields whose bytes (or bit, for a BOOL) changed.
+Consumers get a Change for every changed field, through a callback or by
+iterating over the queued changes::
+
+    poller = snap7.scheduler.Poller(client)
+    subscriber = snap7.subscription.Subscriber(poller)
+    subscriber.subscribe('valve1', (S7AreaDB, 1, 0, 130), 0.1,
+                         specification=rc_if_db_1_layout, layout_offset=4)
+
+    threading.Thread(target=subscriber.run).start()
+    for change in subscriber.changes():
+        print(change.tag, change.field, change.value)
+
+The first poll of a tag reports all its fields.
+"""
+from collections import namedtuple
+import logging
+
+from snap7 import util
+from snap7.six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+Change = namedtuple('Change', 'tag field value')
+
+
+class Subscription(object):
+    """
+    Detects the changed fields of one tag.
+    """
+    def __init__(self, name, specification=None, layout_offset=0):
+        """
+        :param name: the name of the tag
+        :param specification: a layout specification text or snap7.util.Layout,
+                              without one the whole tag is a single field
+                              with the raw bytes as value
+        :param layout_offset: the layout index of the first byte of the tag
+        """
+        self.name = name
+        self.previous = None
+        self.fields = []
+        # offset of the tag data relative to the layout byte indexes
+        self._offset = -layout_offset
+        if specification is not None:
+            layout = specification if isinstance(specification, util.Layout) \
+                else util.Layout(specification)
+            self.fields = list(layout.fields.values())
+
+    def _changed(self, field, data, previous):
+        start = field.byte_index + self._offset
+        if field.mask is not None:
+            return (data[start] ^ previous[start]) & field.mask
+        end = start + field.size
+        return data[start:end] != previous[start:end]
+
+    def update(self, data):
+        """
+        Compares a new buffer with the previous one.
+
+        :returns: a list with a Change for every changed field
+        """
+        data = bytearray(data)
+        previous, self.previous = self.previous, data
+        if previous == data:
+            return []
+        if not self.fields:
+            return [Change(self.name, None, data)]
+
+        offset = self._offset
+        return [Change(self.name, field.name, field.get(data, offset))
+                for field in self.fields
+                if previous is None or self._changed(field, data, previous)]
+
+
+class Subscriber(object):
+    """
+    Polls subscribed tags with a snap7.scheduler.Poller and publishes the
+    changes.
+    """
+    def __init__(self, poller, callback=None):
+        """
+        :param poller: the snap7.scheduler.Poller that reads the tags
+        :param callback: called with the list of changes of every tick,
+                         without a callback changes are queued for changes()
+        """
+        self.poller = poller
+        self.callback = callback
+        self.subscriptions = {}
+        self._queue = queue.Queue()
+
+    def subscribe(self, name, tag, interval, specification=None,
+                  layout_offset=0):
+        """
+        Polls a tag and reports its changes.
+
+        :param tag: an (area, dbnumber, start, size) tuple
+        :param interval: scan interval in seconds
+        """
+        self.subscriptions[name] = Subscription(name, specification,
+                                                layout_offset)
+        self.poller.add(name, tag, interval)
+
+    def unsubscribe(self, name):
+        del self.subscriptions[name]
+        self.poller.remove(name)
+
+    def dispatch(self, values):
+        """
+        Detects and publishes the changes in a dict of polled tag values.
+
+        :returns: the list of changes
+        """
+        changes = []
+        for name, data in values.items():
+            subscription = self.subscriptions.get(name)
+            if subscription is not None:
+                changes.extend(subscription.update(data))
+        if changes:
+            if self.callback:
+                self.callback(changes)
+            else:
+                for change in changes:
+                    self._queue.put(change)
+        return changes
+
+    def run(self):
+        """
+        Polls until stop() is called.
+        """
+        self.poller.run(self.dispatch)
+
+    def stop(self):
+        self.poller.stop()
+
+    def changes(self, timeout=None):
+        """
+        Iterates over the queued changes, blocking until there are new ones.
+
+        :param timeout: stop iterating after waiting this long (s) for a
+                        change, None waits forever
+        """
+        while True:
+            try:
+                yield self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return
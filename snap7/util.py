@@ -90,13 +90,22 @@ except ImportError:
     from ordereddict import OrderedDict
 
 
+from collections import namedtuple
+from itertools import chain
+from operator import itemgetter
 import struct
 import logging
 from snap7 import six
+from snap7.common import check_error
+from snap7.snap7types import S7AreaDB
 import re
 
 logger = logging.getLogger(__name__)
 
+# the 8 bits of every byte value as booleans, bit 0 first
+bit_table = [tuple(byte >> bit & 1 == 1 for bit in range(8))
+             for byte in range(256)]
+
 
 def get_bool(_bytearray, byte_index, bool_index):
     """
@@ -113,19 +122,40 @@ def set_bool(_bytearray, byte_index, bool_index, value):
     Set boolean value on location in bytearray
     """
     assert value in [0, 1, True, False]
-    current_value = get_bool(_bytearray, byte_index, bool_index)
     index_value = 1 << bool_index
 
-    # check if bool already has correct value
-    if current_value == value:
-        return
-
     if value:
         # make sure index_v is IN current byte
-        _bytearray[byte_index] += index_value
+        _bytearray[byte_index] |= index_value
     else:
         # make sure index_v is NOT in current byte
-        _bytearray[byte_index] -= index_value
+        _bytearray[byte_index] &= ~index_value
+
+
+def get_bits(_bytearray, byte_index, size):
+    """
+    Get all bits of ``size`` bytes as a list of booleans, bit x.y of the
+    range is item 8 * x + y
+    """
+    data = bytearray(_bytearray[byte_index:byte_index + size])
+    return list(chain.from_iterable(bit_table[byte] for byte in data))
+
+
+def set_bits(_bytearray, byte_index, bits):
+    """
+    Set the bits of a byte range from a list of booleans, the inverse of
+    get_bits(). Bits after the end of the list keep their value.
+    """
+    size = (len(bits) + 7) // 8
+    data = bytearray(_bytearray[byte_index:byte_index + size])
+    for i in range(size):
+        chunk = bits[i * 8:i * 8 + 8]
+        byte = data[i] & (0xff << len(chunk)) & 0xff
+        for bit, value in enumerate(chunk):
+            if value:
+                byte |= 1 << bit
+        data[i] = byte
+    _bytearray[byte_index:byte_index + size] = data
 
 
 def set_int(_bytearray, byte_index, _int):
@@ -159,11 +189,7 @@ def set_real(_bytearray, byte_index, real):
     make 4 byte data from real
 
     """
-    real = float(real)
-    real = struct.pack('>f', real)
-    _bytes = struct.unpack('4B', real)
-    for i, b in enumerate(_bytes):
-        _bytearray[byte_index + i] = b
+    _bytearray[byte_index:byte_index + 4] = struct.pack('>f', float(real))
 
 
 def get_real(_bytearray, byte_index):
@@ -171,65 +197,64 @@ def get_real(_bytearray, byte_index):
     Get real value. create float from 4 bytes
     """
     x = _bytearray[byte_index:byte_index + 4]
-    real = struct.unpack('>f', struct.pack('4B', *x))[0]
-    return real
+    return struct.unpack('>f', bytearray(x))[0]
 
 
-def set_string(_bytearray, byte_index, value, max_size):
+def set_string(_bytearray, byte_index, value, max_size, encoding='latin-1'):
     """
     Set string value
 
     :params value: string data
     :params max_size: max possible string size
+    :params encoding: codec of the characters, 'latin-1' or 'ascii'
     """
     if six.PY2:
         assert isinstance(value, (str, unicode))
+        data = value if isinstance(value, str) else value.encode(encoding)
     else:
         assert isinstance(value, str)
+        data = value.encode(encoding)
 
-    size = len(value)
+    size = len(data)
     # FAIL HARD WHEN trying to write too much data into PLC
     if size > max_size:
         raise ValueError('size %s > max_size %s %s' % (size, max_size, value))
     # set len count on first position
-    _bytearray[byte_index + 1] = len(value)
+    _bytearray[byte_index + 1] = size
 
-    i = 0
-    # fill array which chr integers
-    for i, c in enumerate(value):
-        _bytearray[byte_index + 2 + i] = ord(c)
+    # fill the rest up to the maximum length in the buffer with spaces
+    padding = max(min(_bytearray[byte_index], max_size) - size, 0)
+    start = byte_index + 2
+    _bytearray[start:start + size + padding] = data + b' ' * padding
 
-    # fill the rest with empty space
-    for r in range(i + 1, _bytearray[byte_index]):
-        _bytearray[byte_index + 2 + r] = ord(' ')
 
-
-def get_string(_bytearray, byte_index, max_size):
+def get_string(_bytearray, byte_index, max_size, encoding='latin-1'):
     """
     parse string from bytearray
+
+    :params encoding: codec of the characters, 'latin-1' or 'ascii'
+    :returns: the decoded text, unicode on python 2
     """
-    size = _bytearray[byte_index + 1]
+    # one slice copy, indexing a memoryview gives a str on python 2
+    data = bytearray(_bytearray[byte_index:byte_index + 2 + max_size])
+    size = data[1]
 
     if max_size < size:
-        logging.error("the string is to big for the size encountered in specification")
-        logging.error("WRONG SIZED STRING ENCOUNTERED")
+        logger.error("the string is to big for the size encountered in "
+                     "specification")
+        logger.error("WRONG SIZED STRING ENCOUNTERED")
         size = max_size
 
-    data = map(chr, _bytearray[byte_index + 2:byte_index + 2 + size])
-    return "".join(data)
+    return data[2:2 + size].decode(encoding)
 
 
 def get_dword(_bytearray, byte_index):
     data = _bytearray[byte_index:byte_index + 4]
-    dword = struct.unpack('>I', struct.pack('4B', *data))[0]
-    return dword
+    return struct.unpack('>I', bytearray(data))[0]
 
 
 def set_dword(_bytearray, byte_index, dword):
-    dword = int(dword)
-    _bytes = struct.unpack('4B', struct.pack('>I', dword))
-    for i, b in enumerate(_bytes):
-        _bytearray[byte_index + i] = b
+    _bytearray[byte_index:byte_index + 4] = struct.pack('>I', int(dword))
 
 
 def parse_specification(db_specification):
@@ -249,6 +274,386 @@ def parse_specification(db_specification):
     return parsed_db_specification
 
 
+# struct formats of the fixed size types of a layout specification, all
+# values are big endian
+type_formats = {
+    'INT': 'H',
+    'REAL': 'f',
+    'DWORD': 'I',
+}
+# NumPy formats of the fixed size types
+numpy_formats = {
+    'INT': '>u2',
+    'REAL': '>f4',
+    'DWORD': '>u4',
+}
+type_structs = dict((_type, struct.Struct('>' + _format))
+                    for _type, _format in type_formats.items())
+
+
+class LayoutField(object):
+    """
+    A field of a compiled layout. The byte index, bit mask and struct of the
+    field are resolved once, get() and set() read and write the field without
+    looking at the type again.
+    """
+    __slots__ = ('name', 'index', 'type', 'byte_index', 'mask', 'size',
+                 'max_size', 'struct', 'encoding', 'get', 'set')
+
+    def __init__(self, name, index, _type, encoding='latin-1'):
+        self.name = name
+        self.index = index
+        self.type = _type
+        self.encoding = encoding
+        self.mask = None
+        self.max_size = None
+        self.struct = None
+
+        if _type == 'BOOL':
+            byte_index, bool_index = index.split('.')
+            self.byte_index = int(byte_index)
+            self.mask = 1 << int(bool_index)
+            self.size = 1
+            self.get = self._get_bool
+            self.set = self._set_bool
+            return
+
+        self.byte_index = int(index)
+        if _type.startswith('STRING'):
+            self.max_size = int(re.search(r'\d+', _type).group(0))
+            self.size = self.max_size + 2
+            self.get = self._get_string
+            self.set = self._set_string
+        elif _type in type_structs:
+            self.struct = type_structs[_type]
+            self.size = self.struct.size
+            self.get = self._get_struct
+            self.set = getattr(self, '_set_' + _type.lower())
+        else:
+            raise ValueError('unknown type %s of %s' % (_type, name))
+
+    def _get_bool(self, _bytearray, offset):
+        return _bytearray[self.byte_index + offset] & self.mask == self.mask
+
+    def _set_bool(self, _bytearray, offset, value):
+        assert value in [0, 1, True, False]
+        if value:
+            _bytearray[self.byte_index + offset] |= self.mask
+        else:
+            _bytearray[self.byte_index + offset] &= ~self.mask
+
+    def _get_string(self, _bytearray, offset):
+        return get_string(_bytearray, self.byte_index + offset, self.max_size,
+                          self.encoding)
+
+    def _set_string(self, _bytearray, offset, value):
+        set_string(_bytearray, self.byte_index + offset, value, self.max_size,
+                   self.encoding)
+
+    def _get_struct(self, _bytearray, offset):
+        return self.struct.unpack_from(_bytearray, self.byte_index + offset)[0]
+
+    def _set_int(self, _bytearray, offset, value):
+        self.struct.pack_into(_bytearray, self.byte_index + offset, int(value))
+
+    _set_dword = _set_int
+
+    def _set_real(self, _bytearray, offset, value):
+        self.struct.pack_into(_bytearray, self.byte_index + offset,
+                              float(value))
+
+
+class Layout(object):
+    """
+    A layout specification parsed once, to be shared by all rows using it.
+
+    Field byte indexes are kept as written in the specification, a row adds
+    its own offset (db_offset - layout_offset) when accessing a field.
+    """
+    def __init__(self, specification, encoding='latin-1'):
+        """
+        :param specification: the layout text, see parse_specification()
+        :param encoding: codec of the STRING fields
+        """
+        self.text = specification
+        self.encoding = encoding
+        self.specification = parse_specification(specification)
+        self.fields = OrderedDict(
+            (name, LayoutField(name, index, _type, encoding))
+            for name, (index, _type) in self.specification.items())
+        self.names = tuple(self.fields)
+        self._record = None
+        self._compile_struct()
+        self._compile_strings()
+
+    def _compile_struct(self):
+        """
+        Combines all fields into one struct, so a whole row is decoded with
+        a single unpack_from(). BOOLs in the same byte share one 'B' item, a
+        STRING is read as its length byte plus the raw characters.
+
+        Layouts with overlapping fields keep decoding field by field.
+        """
+        self.struct = None
+        self.start = 0
+        fields = sorted(self.fields.values(), key=lambda f: f.byte_index)
+        if not fields:
+            return
+        start = position = fields[0].byte_index
+        formats = []
+        items = 0                # number of values unpacked so far
+        bool_items = {}          # byte index -> item of that byte
+        locations = {}           # field name -> item of its (first) value
+        for field in fields:
+            if field.type == 'BOOL' and field.byte_index in bool_items:
+                locations[field.name] = bool_items[field.byte_index]
+                continue
+            if field.byte_index < position:
+                logger.debug("overlapping fields, no combined struct")
+                return
+            formats.append('%sx' % (field.byte_index - position))
+            locations[field.name] = items
+            if field.type == 'BOOL':
+                bool_items[field.byte_index] = items
+                formats.append('B')
+                items += 1
+            elif field.max_size is not None:
+                formats.append('xB%ds' % field.max_size)
+                items += 2
+            else:
+                formats.append(type_formats[field.type])
+                items += 1
+            position = field.byte_index + field.size
+
+        self.start = start
+        self.struct = struct.Struct('>' + ''.join(formats))
+        # unpack_from() appends the bits of all BOOL bytes and the decoded
+        # STRINGs to the unpacked values, and picks the fields from that
+        self._bool_items = sorted(bool_items.values())
+        self._string_items = []
+        bits = dict((item, items + 8 * i)
+                    for i, item in enumerate(self._bool_items))
+        positions = []
+        for field in self.fields.values():
+            item = locations[field.name]
+            if field.type == 'BOOL':
+                bit = field.mask.bit_length() - 1
+                positions.append(bits[item] + bit)
+            elif field.max_size is not None:
+                positions.append(items + 8 * len(bits) +
+                                 len(self._string_items))
+                self._string_items.append(_string_converter(
+                    item, field.max_size, self.encoding))
+            else:
+                positions.append(item)
+        self._select = itemgetter(*positions)
+        self._single = len(positions) == 1
+        # all fields are plain numbers in layout order, nothing to convert
+        self._direct = items == len(self.fields) and all(
+            field.struct is not None and locations[name] == i
+            for i, (name, field) in enumerate(self.fields.items()))
+
+    def unpack_from(self, _bytearray, offset=0):
+        """
+        Decodes all fields of a row at once.
+
+        :param offset: added to the layout byte indexes, db_offset -
+                       layout_offset for a row
+        :returns: a tuple with the field values in layout order
+        """
+        if self.struct is None:
+            return tuple(field.get(_bytearray, offset)
+                         for field in self.fields.values())
+        values = self.struct.unpack_from(_bytearray, self.start + offset)
+        if self._direct:
+            return values
+        extra = list(chain.from_iterable(bit_table[values[item]]
+                                         for item in self._bool_items))
+        extra.extend([convert(values) for convert in self._string_items])
+        if self._single:
+            return (self._select(values + tuple(extra)),)
+        return self._select(values + tuple(extra))
+
+    def _compile_strings(self):
+        """
+        Combines the STRING fields into one struct for unpack_strings().
+        """
+        fields = sorted((field for field in self.fields.values()
+                         if field.max_size is not None),
+                        key=lambda f: f.byte_index)
+        self.string_names = tuple(field.name for field in fields)
+        self._strings = None
+        self._string_start = 0
+        if not fields:
+            return
+        position = fields[0].byte_index
+        formats = []
+        for field in fields:
+            if field.byte_index < position:
+                return
+            formats.append('%sxxB%ds' % (field.byte_index - position,
+                                         field.max_size))
+            position = field.byte_index + field.size
+        self._string_start = fields[0].byte_index
+        self._strings = struct.Struct('>' + ''.join(formats))
+        self._string_converters = [
+            _string_converter(2 * i, field.max_size, self.encoding)
+            for i, field in enumerate(fields)]
+
+    def unpack_strings(self, _bytearray, offset=0):
+        """
+        Decodes all STRING fields of a row at once.
+
+        :param offset: added to the layout byte indexes, db_offset -
+                       layout_offset for a row
+        :returns: a tuple with the strings in the order of string_names
+        """
+        if self._strings is None:
+            fields = self.fields
+            return tuple(fields[name].get(_bytearray, offset)
+                         for name in self.string_names)
+        values = self._strings.unpack_from(_bytearray,
+                                           self._string_start + offset)
+        return tuple([convert(values) for convert in self._string_converters])
+
+    def dtype(self, row_size, layout_offset=0):
+        """
+        Returns a big endian NumPy structured dtype for a row. Requires numpy.
+
+        INT, REAL and DWORD map to >u2, >f4 and >u4 (INT is unsigned, like
+        get_int()). A BOOL maps to the whole byte that holds it, BOOLs of the
+        same byte overlap; use DB.column() to get the bits. A STRING[n] maps
+        to a structure with its 'max' and 'length' bytes and the raw 'data'.
+
+        :param row_size: size of a row in bytes
+        :param layout_offset: the layout byte index of the first row byte
+        """
+        import numpy
+        names, formats, offsets = [], [], []
+        for field in self.fields.values():
+            offset = field.byte_index - layout_offset
+            if offset < 0 or offset + field.size > row_size:
+                raise ValueError('field %s is outside the row' % field.name)
+            if field.type == 'BOOL':
+                _format = 'u1'
+            elif field.max_size is not None:
+                _format = numpy.dtype([('max', 'u1'), ('length', 'u1'),
+                                       ('data', 'S%d' % field.max_size)])
+            else:
+                _format = numpy_formats[field.type]
+            names.append(field.name)
+            formats.append(_format)
+            offsets.append(offset)
+        return numpy.dtype({'names': names, 'formats': formats,
+                            'offsets': offsets, 'itemsize': row_size})
+
+    @property
+    def record(self):
+        """
+        A namedtuple class with a member for every field.
+        """
+        if self._record is None:
+            self._record = namedtuple('Record', self.names, rename=True)
+        return self._record
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+
+def _string_converter(item, max_size, encoding):
+    def convert(values):
+        size = values[item]
+        if max_size < size:
+            logger.error("the string is to big for the size encountered in "
+                         "specification")
+            size = max_size
+        return values[item + 1][:size].decode(encoding)
+    return convert
+
+
+class Index(object):
+    """
+    Maps the values of one field to the row numbers of a DB.
+
+    The index is brought up to date when it is used. Only the rows that were
+    invalidated since are checked, and only the rows of which the field
+    bytes really changed are decoded again.
+
+    Row setters, DB.read() and DB.set_data() invalidate the rows they
+    change. Changes made to the buffer any other way (slicing the bytearray,
+    the util set_* functions, DB.as_array() or codegen accessors) are not
+    seen until DB.invalidate() is called for them.
+    """
+    def __init__(self, db, name, unique=False):
+        """
+        :param name: the name of the indexed field
+        :param unique: map every value to one row number instead of a list
+        """
+        self.db = db
+        self.name = name
+        self.field = db.layout.fields[name]
+        self.unique = unique
+        self._bytes = [None] * db.size    # field bytes per row
+        self._values = [None] * db.size   # field value per row
+        self._stale = set(range(db.size))
+        self._map = None
+
+    def invalidate(self, first=0, last=None):
+        """
+        Marks rows ``first`` up to and including ``last`` to be checked.
+        """
+        size = self.db.size
+        last = size - 1 if last is None else min(last, size - 1)
+        self._stale.update(range(max(first, 0), last + 1))
+
+    def refresh(self):
+        """
+        :returns: the up to date mapping of field values to row numbers
+        """
+        if not self._stale:
+            return self._map
+        db = self.db
+        field = self.field
+        data = db._bytearray
+        changed = self._map is None
+        base = db.db_offset - db.layout_offset
+        for i in self._stale:
+            offset = base + i * db.row_size
+            start = offset + field.byte_index
+            key = data[start:start + field.size]
+            if key == self._bytes[i]:
+                continue
+            self._bytes[i] = key
+            value = field.get(data, offset)
+            if value != self._values[i]:
+                self._values[i] = value
+                changed = True
+        self._stale.clear()
+        if changed:
+            self._map = self._build()
+        return self._map
+
+    def _build(self):
+        if self.unique:
+            mapping = OrderedDict()
+            for number, value in enumerate(self._values):
+                if value and value in mapping:
+                    msg = '%s not unique!' % value
+                    logger.error(msg)
+                mapping[value] = number
+            return mapping
+        mapping = {}
+        for number, value in enumerate(self._values):
+            mapping.setdefault(value, []).append(number)
+        return mapping
+
+
 class DB(object):
     """
     Manage a DB bytearray block given a specification
@@ -261,6 +666,9 @@ class DB(object):
 
     db1[0]['testbool1'] = test
     db1.write()   # puts data in plc
+
+    A lazy DB creates rows when they are accessed and keeps the last
+    ``cache_size`` of them, so a DB over a big buffer is cheap to make.
     """
     _bytearray = None      # data from plc
     specification = None   # layout of db rows
@@ -275,7 +683,12 @@ class DB(object):
 
     def __init__(self, db_number, _bytearray,
                  specification, row_size, size, id_field=None,
-                 db_offset=0, layout_offset=0, row_offset=0):
+                 db_offset=0, layout_offset=0, row_offset=0, lazy=False,
+                 cache_size=1024, encoding='latin-1'):
+        """
+        :param specification: a layout specification text or a Layout
+        :param encoding: codec of the STRING fields of a specification text
+        """
 
         self.db_number = db_number
         self.size = size
@@ -285,62 +698,344 @@ class DB(object):
         self.db_offset = db_offset
         self.layout_offset = layout_offset
         self.row_offset = row_offset
+        assert cache_size > 0, 'cache_size should be positive'
+        self.lazy = lazy
+        self.cache_size = cache_size
 
         self._bytearray = _bytearray
         self.specification = specification
-        # loop over bytearray. make rowObjects
-        # store index of id_field to row objects
-        self.index = OrderedDict()
+        self.layout = specification if isinstance(specification, Layout) \
+            else Layout(specification, encoding)
+        # byte ranges (start, end) changed since the last flush
+        self._dirty = []
+        # field name -> Index, the id_field index is unique
+        self.indexes = {}
         self.make_rows()
 
     def make_rows(self):
-        id_field = self.id_field
-        row_size = self.row_size
-        specification = self.specification
-        layout_offset = self.layout_offset
-
-        for i in range(self.size):
-            # calculate where row in bytearray starts
-            db_offset = i * row_size + self.db_offset
-            # create a row object
-            row = DB_Row(self,
-                         specification,
-                         row_size=row_size,
-                         db_offset=db_offset,
-                         layout_offset=layout_offset,
-                         row_offset=self.row_offset)
-
-            # store row object
-            key = row[id_field] if id_field else i
-            if key and key in self.index:
-                msg = '%s not unique!' % key
-                logging.error(msg)
-            self.index[key] = row
+        if self.lazy:
+            # row number -> row, least recently used first
+            self._rows = None
+            self._cache = OrderedDict()
+        else:
+            self._rows = [self._make_row(i) for i in range(self.size)]
+        # rows by key, made by the index property
+        self._index = None
+        self._index_map = None
+        names = list(self.indexes)
+        self.indexes = {}
+        if self.id_field:
+            self.indexes[self.id_field] = Index(self, self.id_field,
+                                                unique=True)
+        for name in names:
+            if name != self.id_field:
+                self.add_index(name)
+
+    def _make_row(self, number):
+        # calculate where row in bytearray starts
+        db_offset = number * self.row_size + self.db_offset
+        return DB_Row(self,
+                      self.layout,
+                      row_size=self.row_size,
+                      db_offset=db_offset,
+                      layout_offset=self.layout_offset,
+                      row_offset=self.row_offset)
+
+    def row(self, number):
+        """
+        Returns a row by its number.
+        """
+        if self._rows is not None:
+            return self._rows[number]
+        if not 0 <= number < self.size:
+            raise IndexError('row %s out of range' % number)
+        cache = self._cache
+        row = cache.pop(number, None)
+        if row is None:
+            row = self._make_row(number)
+            if len(cache) >= self.cache_size:
+                cache.popitem(last=False)
+        cache[number] = row
+        return row
+
+    @property
+    def rows(self):
+        """
+        A list with all rows in row order, this creates every row of a lazy
+        DB.
+        """
+        if self._rows is not None:
+            return self._rows
+        return [self.row(i) for i in range(self.size)]
+
+    def _numbers(self):
+        """
+        :returns: the row numbers by key
+        """
+        if self.id_field:
+            return self.indexes[self.id_field].refresh()
+        return None
+
+    @property
+    def index(self):
+        """
+        The rows by id_field value, or by row number without id_field.
+        This creates every row of a lazy DB.
+        """
+        numbers = self._numbers()
+        if self._index is None or self._index_map is not numbers or \
+                self.lazy:
+            if numbers is None:
+                self._index = OrderedDict(enumerate(self.rows))
+            else:
+                self._index = OrderedDict((key, self.row(number))
+                                          for key, number in numbers.items())
+            self._index_map = numbers
+        return self._index
+
+    def add_index(self, name):
+        """
+        Adds a secondary index on a field, see lookup().
+        """
+        if name not in self.indexes:
+            self.indexes[name] = Index(self, name)
+
+    def lookup(self, name, value):
+        """
+        Finds rows by the value of an indexed field.
+
+        :returns: a list with the rows that have the value, in row order
+        """
+        index = self.indexes[name]
+        numbers = index.refresh().get(value)
+        if index.unique:
+            return [] if numbers is None else [self.row(numbers)]
+        return [self.row(number) for number in numbers or ()]
+
+    def invalidate(self, start=0, end=None):
+        """
+        Tells the indexes that the db bytes from ``start`` up to ``end``
+        changed, None for all bytes. Call this after changing the buffer
+        other than through the rows, or keyed lookups may miss rows.
+        """
+        if not self.indexes:
+            return
+        if not self.row_size or end is None:
+            first, last = 0, None
+        else:
+            first = (start - self.db_offset) // self.row_size
+            last = (end - 1 - self.db_offset) // self.row_size
+        for index in self.indexes.values():
+            index.invalidate(first, last)
 
     def __getitem__(self, key, default=None):
-        return self.index.get(key, default)
+        numbers = self._numbers()
+        if numbers is not None:
+            number = numbers.get(key)
+        elif isinstance(key, six.integer_types) and 0 <= key < self.size:
+            number = key
+        else:
+            number = None
+        if number is None:
+            return default
+        return self.row(number)
+
+    def as_array(self):
+        """
+        Returns a NumPy structured array viewing the rows, without copying.
+        Writes to the array change the DB data. Requires numpy.
+
+        See Layout.dtype() for the dtype of the rows.
+        """
+        import numpy
+        dtype = self.layout.dtype(self.row_size, self.layout_offset)
+        return numpy.frombuffer(self._bytearray, dtype, count=self.size,
+                                offset=self.db_offset)
+
+    def strings(self):
+        """
+        Decodes the STRING fields of all rows.
+
+        :returns: a list with a tuple of strings for every row, in the order
+                  of Layout.string_names
+        """
+        unpack_strings = self.layout.unpack_strings
+        _bytearray = self._bytearray
+        row_size = self.row_size
+        base = self.db_offset - self.layout_offset
+        return [unpack_strings(_bytearray, base + i * row_size)
+                for i in range(self.size)]
+
+    def column(self, name):
+        """
+        Returns the values of one field of all rows as a NumPy array.
+        Numbers are a view on the DB data, BOOLs a boolean array and
+        STRINGs an array of decoded strings. Requires numpy.
+        """
+        import numpy
+        field = self.layout.fields[name]
+        values = self.as_array()[name]
+        if field.type == 'BOOL':
+            return values & field.mask != 0
+        if field.max_size is not None:
+            lengths = numpy.minimum(values['length'], field.max_size)
+            encoding = self.layout.encoding
+            strings = [data[:length].decode(encoding)
+                       for length, data in zip(lengths, values['data'])]
+            return numpy.array(strings, dtype=object)
+        return values
+
+    def export(self, kind='dict'):
+        """
+        Decodes all rows, every row with a single struct unpack.
+
+        :param kind: 'tuple', 'dict' or 'record' (a namedtuple, see
+                     Layout.record)
+        :returns: a list with the decoded rows, in row order
+        """
+        unpack_from = self.layout.unpack_from
+        _bytearray = self._bytearray
+        row_size = self.row_size
+        base = self.db_offset - self.layout_offset
+        rows = [unpack_from(_bytearray, base + i * row_size)
+                for i in range(self.size)]
+        if kind == 'tuple':
+            return rows
+        if kind == 'dict':
+            names = self.layout.names
+            return [dict(zip(names, row)) for row in rows]
+        if kind == 'record':
+            record = self.layout.record
+            return [record._make(row) for row in rows]
+        raise ValueError('unknown export kind %s' % kind)
 
     def __iter__(self):
-        for key, row in self.index.items():
-            yield key, row
+        numbers = self._numbers()
+        if numbers is None:
+            for number in range(self.size):
+                yield number, self.row(number)
+        else:
+            for key, number in list(numbers.items()):
+                yield key, self.row(number)
 
     def __len__(self):
-        return len(self.index)
+        numbers = self._numbers()
+        return self.size if numbers is None else len(numbers)
+
+    def read(self, client):
+        """
+        Reads the data of all rows from the db in the plc with one call,
+        straight into the DB bytearray. The library splits the transfer in
+        PDU sized requests. Changes that were not flushed are lost.
+        """
+        start = self.db_offset
+        end = start + self.size * self.row_size
+        client.db_read_into(self._bytearray, self.db_number, start,
+                            end - start, start)
+        self.mark_clean(start, end)
+        self.invalidate(start, end)
 
     def set_data(self, _bytearray):
         assert(isinstance(_bytearray, bytearray))
         self._bytearray = _bytearray
+        self._dirty = []
+        self.invalidate()
+
+    def mark_dirty(self, start, size):
+        """
+        Records that ``size`` bytes at db byte ``start`` were changed and
+        should be written by flush().
+        """
+        if size > 0:
+            self._dirty.append((start, start + size))
+
+    def mark_clean(self, start=0, end=None):
+        """
+        Forgets the changes between db byte ``start`` and ``end``.
+        """
+        dirty = []
+        for r_start, r_end in self._dirty:
+            if r_end <= start or (end is not None and r_start >= end):
+                dirty.append((r_start, r_end))
+                continue
+            if r_start < start:
+                dirty.append((r_start, start))
+            if end is not None and r_end > end:
+                dirty.append((end, r_end))
+        self._dirty = dirty
+
+    def dirty_ranges(self, max_gap=0, start=0, end=None):
+        """
+        Merges the changed byte ranges between ``start`` and ``end``.
+
+        :param max_gap: the biggest unchanged gap in bytes to merge over
+        :returns: a sorted list of (start, size) tuples
+        """
+        ranges = []
+        for r_start, r_end in sorted(self._dirty):
+            r_start = max(r_start, start)
+            if end is not None:
+                r_end = min(r_end, end)
+            if r_start >= r_end:
+                continue
+            if ranges and r_start - ranges[-1][1] <= max_gap:
+                ranges[-1][1] = max(ranges[-1][1], r_end)
+            else:
+                ranges.append([r_start, r_end])
+        return [(r_start, r_end - r_start) for r_start, r_end in ranges]
+
+    def flush(self, client, max_gap=0, start=0, end=None):
+        """
+        Writes the changed byte ranges to the db in the plc, with as few
+        multi variable requests as possible (see Client.write_tags()).
+
+        Merging over gaps saves items, but writes the gap bytes back too,
+        which overwrites changes the plc made to them.
+
+        :param max_gap: the biggest unchanged gap in bytes to write along
+        :param start: first db byte to flush
+        :param end: db byte after the last one to flush, None for all
+        :returns: the list of (start, size) ranges that were written
+        """
+        ranges = self.dirty_ranges(max_gap, start, end)
+        if not ranges:
+            return []
+        data = self._bytearray
+        tags = [(S7AreaDB, self.db_number, r_start,
+                 data[r_start:r_start + size])
+                for r_start, size in ranges]
+        results = client.write_tags(tags)
+        self.mark_clean(start, end)
+        for (r_start, size), result in zip(ranges, results):
+            if result:
+                self.mark_dirty(r_start, size)
+        for result in results:
+            check_error(result, context="client")
+        return ranges
 
 
 class DB_Row(object):
     """
     Provide ROW API for DB bytearray
     """
-    _bytearray = None      # data of reference to parent DB
-    _specification = None  # row specification
+    __slots__ = (
+        '_bytearray',       # data of reference to parent DB
+        '_specification',   # row specification
+        '_layout',          # compiled row specification
+        '_offset',
+        'db_offset',
+        'layout_offset',
+        'row_size',
+        'row_offset',
+    )
 
     def __init__(self, _bytearray, _specification, row_size=0,
-                 db_offset=0, layout_offset=0, row_offset=0):
+                 db_offset=0, layout_offset=0, row_offset=0,
+                 encoding='latin-1'):
+        """
+        :param _specification: a layout specification text or a Layout
+        :param encoding: codec of the STRING fields of a specification text
+        """
 
         self.db_offset = db_offset          # start point of row data in db
         self.layout_offset = layout_offset  # start point of row data in layout
@@ -349,7 +1044,12 @@ class DB_Row(object):
 
         assert(isinstance(_bytearray, (bytearray, DB)))
         self._bytearray = _bytearray
-        self._specification = parse_specification(_specification)
+        if not isinstance(_specification, Layout):
+            _specification = Layout(_specification, encoding)
+        self._layout = _specification
+        self._specification = _specification.specification
+        # offset of the row data relative to the layout byte indexes
+        self._offset = db_offset - layout_offset
 
     def get_bytearray(self):
         """
@@ -363,23 +1063,34 @@ class DB_Row(object):
         """
         export dictionary with values
         """
-        data = {}
-        for key in self._specification:
-            data[key] = self[key]
-        return data
+        values = self._layout.unpack_from(self.get_bytearray(), self._offset)
+        return dict(zip(self._layout.names, values))
 
     def __getitem__(self, key):
         """
         Get a specific db field
         """
-        assert key in self._specification
-        index, _type = self._specification[key]
-        return self.get_value(index, _type)
+        return self._layout.fields[key].get(self.get_bytearray(),
+                                            self._offset)
 
     def __setitem__(self, key, value):
-        assert key in self._specification
-        index, _type = self._specification[key]
-        self.set_value(index, _type, value)
+        field = self._layout.fields[key]
+        field.set(self.get_bytearray(), self._offset, value)
+        self._mark_dirty(field.byte_index + self._offset, field.size)
+
+    def _mark_dirty(self, start, size):
+        """
+        Records a change with the parent DB, leaving out the read only part
+        of the row before row_offset.
+        """
+        if not isinstance(self._bytearray, DB):
+            return
+        self._bytearray.invalidate(start, start + size)
+        write_start = self.db_offset + self.row_offset
+        if start < write_start:
+            size -= write_start - start
+            start = write_start
+        self._bytearray.mark_dirty(start, size)
 
     def __repr__(self):
 
@@ -434,23 +1145,28 @@ class DB_Row(object):
 
         if _type == 'BOOL':
             byte_index, bool_index = byte_index.split('.')
-            return set_bool(_bytearray, self.get_offset(byte_index),
-                            int(bool_index), value)
+            byte_index = self.get_offset(byte_index)
+            self._mark_dirty(byte_index, 1)
+            return set_bool(_bytearray, byte_index, int(bool_index), value)
 
         byte_index = self.get_offset(byte_index)
 
         if _type.startswith('STRING'):
             max_size = re.search('\d+', _type).group(0)
             max_size = int(max_size)
+            self._mark_dirty(byte_index, max_size + 2)
             return set_string(_bytearray, byte_index, value, max_size)
 
         if _type == 'REAL':
+            self._mark_dirty(byte_index, 4)
             return set_real(_bytearray, byte_index, value)
 
         if _type == 'DWORD':
+            self._mark_dirty(byte_index, 4)
             return set_dword(_bytearray, byte_index, value)
 
         if _type == 'INT':
+            self._mark_dirty(byte_index, 2)
             return set_int(_bytearray, byte_index, value)
 
         raise ValueError
@@ -473,6 +1189,16 @@ class DB_Row(object):
             db_offset += self.row_offset
 
         client.db_write(db_nr, db_offset, data)
+        self._bytearray.mark_clean(db_offset, offset + self.row_size)
+
+    def flush(self, client, max_gap=0):
+        """
+        Write only the changed fields of the row to db in plc, see DB.flush()
+        """
+        assert(isinstance(self._bytearray, DB))
+        start = self.db_offset + self.row_offset
+        return self._bytearray.flush(client, max_gap, start,
+                                     self.db_offset + self.row_size)
 
     def read(self, client):
         """
@@ -481,9 +1207,10 @@ class DB_Row(object):
         assert(isinstance(self._bytearray, DB))
         assert(self.row_size >= 0)
         db_nr = self._bytearray.db_number
-        _bytearray = client.db_read(db_nr, self.db_offset, self.row_size)
-
-        data = self.get_bytearray()
-        # replace data in bytearray
-        for i, b in enumerate(_bytearray):
-            data[i + self.db_offset] = b
+        start = self.db_offset
+        end = start + self.row_size
+        # read straight into the row part of the bytearray
+        client.db_read_into(self.get_bytearray(), db_nr, start, end - start,
+                            start)
+        self._bytearray.mark_clean(start, end)
+        self._bytearray.invalidate(start, end)
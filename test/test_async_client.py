@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+import unittest
+
+from subprocess import Popen
+from os import path, kill
+import snap7
+from snap7.async_client import AsyncClient
+
+
+logging.basicConfig(level=logging.WARNING)
+
+ip = '127.0.0.1'
+tcpport = 1102
+db_number = 1
+rack = 1
+slot = 1
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        server_path = path.join(path.dirname(path.realpath(snap7.__file__)),
+                                "bin/snap7-server.py")
+        cls.server_pid = Popen([server_path]).pid
+        time.sleep(2)  # wait for server to start
+
+    @classmethod
+    def tearDownClass(cls):
+        kill(cls.server_pid, 1)
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.client = AsyncClient()
+        self._await(self.client.connect(ip, rack, slot, tcpport))
+
+    def tearDown(self):
+        self.client.disconnect()
+        self.client.destroy()
+        self.loop.close()
+
+    def _await(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_db_read(self):
+        data = bytearray(range(40))
+        self._await(self.client.db_write(db_number, 0, data))
+        result = self._await(self.client.db_read(db_number, 0, 40))
+        self.assertEqual(data, result)
+
+    def test_read_area(self):
+        area = snap7.snap7types.areas.DB
+        data = bytearray(range(10))
+        self._await(self.client.write_area(area, db_number, 10, data))
+        result = self._await(self.client.read_area(area, db_number, 10, 10))
+        self.assertEqual(data, result)
+
+    def test_concurrent(self):
+        data = bytearray(range(100))
+        self._await(self.client.db_write(db_number, 0, data))
+        reads = [self.client.db_read(db_number, i * 10, 10) for i in range(10)]
+        results = self._await(asyncio.gather(*reads))
+        self.assertEqual(b''.join(results), data)
+
+    def test_cancel(self):
+        data = bytearray(range(100))
+        self._await(self.client.db_write(db_number, 0, data))
+
+        async def cancel_read():
+            buffer = bytearray(100)
+            task = asyncio.ensure_future(self.client.db_read_into(
+                buffer, db_number, 0))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # the cancelled job ran to its end
+            self.assertEqual(buffer, data)
+            return await self.client.db_read(db_number, 10, 10)
+
+        self.assertEqual(self._await(cancel_read()), data[10:20])
+
+    def test_db_read_into_offset(self):
+        data = bytearray(range(10))
+        self._await(self.client.db_write(db_number, 0, data))
+        buffer = bytearray(14)
+        size = self._await(self.client.db_read_into(buffer, db_number, 0, 10,
+                                                    offset=4))
+        self.assertEqual(size, 10)
+        self.assertEqual(buffer, bytearray(4) + data)
+
+    def test_db_get(self):
+        self._await(self.client.db_get(db_number))
+
+
+if __name__ == '__main__':
+    unittest.main()
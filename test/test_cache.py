@@ -0,0 +1,84 @@
+import time
+import unittest
+
+from snap7.cache import ReadCache
+from snap7.snap7types import S7AreaDB, S7AreaMK, S7AreaPE
+
+
+class TestReadCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ReadCache(ttl=10, max_bytes=100)
+        self.data = bytearray(range(20))
+
+    def test_exact(self):
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 20), None)
+        self.cache.put(S7AreaDB, 1, 0, self.data)
+        data = self.cache.get(S7AreaDB, 1, 0, 20)
+        self.assertEqual(data, self.data)
+        # results are copies
+        data[0] = 99
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 20), self.data)
+        self.assertEqual(self.cache.get(S7AreaDB, 2, 0, 20), None)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+        self.assertEqual((stats['entries'], stats['bytes']), (1, 20))
+
+    def test_superset(self):
+        self.cache.put(S7AreaDB, 1, 10, self.data)
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 15, 5),
+                         self.data[5:10])
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 25, 5),
+                         self.data[15:20])
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 25, 6), None)
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 9, 2), None)
+
+    def test_db_number_ignored_outside_db(self):
+        self.cache.put(S7AreaMK, 3, 0, self.data)
+        self.assertEqual(self.cache.get(S7AreaMK, 0, 0, 4), self.data[:4])
+
+    def test_ttl(self):
+        cache = ReadCache(ttl=0.01, ttls={S7AreaPE: 0})
+        cache.put(S7AreaDB, 1, 0, self.data)
+        cache.put(S7AreaPE, 0, 0, self.data)
+        self.assertEqual(cache.stats()['entries'], 1)
+        self.assertEqual(cache.get(S7AreaDB, 1, 0, 20), self.data)
+        time.sleep(0.02)
+        self.assertEqual(cache.get(S7AreaDB, 1, 0, 20), None)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_invalidate(self):
+        self.cache.put(S7AreaDB, 1, 0, self.data[:10])
+        self.cache.put(S7AreaDB, 1, 10, self.data[10:])
+        self.cache.put(S7AreaDB, 2, 0, self.data)
+        self.cache.invalidate(S7AreaDB, 1, 10, 1)
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 10), self.data[:10])
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 10, 10), None)
+        self.cache.invalidate(S7AreaDB, 1)
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 10), None)
+        self.assertEqual(self.cache.get(S7AreaDB, 2, 0, 20), self.data)
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+
+    def test_lru(self):
+        for start in range(0, 100, 20):
+            self.cache.put(S7AreaDB, 1, start, self.data)
+        self.cache.get(S7AreaDB, 1, 0, 20)
+        self.cache.put(S7AreaDB, 2, 0, self.data)
+        stats = self.cache.stats()
+        self.assertEqual((stats['evictions'], stats['bytes']), (1, 100))
+        # the least recently used range went
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 20, 20), None)
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 20), self.data)
+        # too big to cache
+        self.cache.put(S7AreaDB, 3, 0, bytearray(101))
+        self.assertEqual(self.cache.get(S7AreaDB, 3, 0, 1), None)
+
+    def test_clear(self):
+        self.cache.put(S7AreaDB, 1, 0, self.data)
+        self.cache.clear()
+        self.assertEqual(self.cache.get(S7AreaDB, 1, 0, 20), None)
+        self.assertEqual(self.cache.stats()['bytes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
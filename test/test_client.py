@@ -9,7 +9,8 @@ from os import path, kill
 import snap7
 from snap7.snap7exceptions import Snap7Exception
 from snap7.snap7types import S7AreaDB, S7WLByte, S7DataItem
-from snap7 import util
+from snap7 import six, util
+from snap7.client import byte_buffer
 
 
 logging.basicConfig(level=logging.WARNING)
@@ -51,6 +52,73 @@ class TestClient(unittest.TestCase):
         result = self.client.db_read(db_number=db, start=start, size=size)
         self.assertEqual(data, result)
 
+    def test_fast_mode(self):
+        self.client.set_fast_mode()
+        data = bytearray(range(10))
+        self.client.db_write(db_number, 0, data)
+        self.assertEqual(self.client.db_read(db_number, 0, 10), data)
+        self.assertEqual(self.client.read_area(S7AreaDB, db_number, 0, 10),
+                         data)
+        self.client.set_fast_mode(False)
+        self.assertFalse(self.client.fast)
+        self.assertRaises(AssertionError, self.client.read_area, 0, 0, 0, 1)
+
+    def test_instrument(self):
+        stats = self.client.instrument()
+        self.assertTrue(self.client.instrument() is stats)
+        self.client.db_write(db_number=db_number, start=0, data=bytearray(4))
+        self.client.db_read(db_number, 0, 10)
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['db_write']['bytes'], 4)
+        self.assertEqual(snapshot['db_read_into']['calls'], 1)
+        self.assertEqual(snapshot['db_read_into']['exec_time']['count'], 1)
+        self.assertTrue(self.client.uninstrument() is stats)
+        self.client.db_read(db_number, 0, 10)
+        self.assertEqual(stats.methods['db_read_into'].calls, 1)
+        self.assertTrue(self.client.get_exec_time() >= 0)
+
+    def test_cache(self):
+        self.client.db_write(db_number, 0, bytearray(range(10)))
+        cache = self.client.enable_cache(ttl=10)
+        self.assertEqual(self.client.db_read(db_number, 0, 10),
+                         bytearray(range(10)))
+        self.assertEqual(self.client.db_read(db_number, 2, 3),
+                         bytearray([2, 3, 4]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.client.db_write(db_number, 4, bytearray([99]))
+        self.assertEqual(self.client.db_read(db_number, 4, 1),
+                         bytearray([99]))
+        self.assertEqual(cache.misses, 2)
+        self.client.disable_cache()
+        self.assertEqual(self.client.cache, None)
+
+    def test_db_read_into(self):
+        data = bytearray(range(40))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        buffer = bytearray(50)
+        size = self.client.db_read_into(buffer, db_number, 0, offset=10)
+        self.assertEqual(size, 40)
+        self.assertEqual(buffer[10:], data)
+        self.assertEqual(buffer[:10], bytearray(10))
+
+    @unittest.skipIf(six.PY2, "memoryviews can't be shared on python 2")
+    def test_db_read_into_memoryview(self):
+        data = bytearray(range(40))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        buffer = bytearray(50)
+        size = self.client.db_read_into(memoryview(buffer)[10:], db_number,
+                                        0, 40)
+        self.assertEqual(size, 40)
+        self.assertEqual(buffer[10:], data)
+
+    def test_read_area_into(self):
+        area = snap7.snap7types.areas.DB
+        data = bytearray(range(20))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        buffer = bytearray(20)
+        self.client.read_area_into(buffer, area, db_number, 0)
+        self.assertEqual(buffer, data)
+
     def test_db_write(self):
         size = 40
         data = bytearray(size)
@@ -129,6 +197,49 @@ class TestClient(unittest.TestCase):
         self.assertEqual(result_values[1], test_values[1])
         self.assertEqual(result_values[2], test_values[2])
 
+    def test_read_tags(self):
+        data = bytearray(range(100))
+        self.client.db_write(db_number, 0, data)
+        tags = [(S7AreaDB, db_number, 0, 4), (S7AreaDB, db_number, 50, 50),
+                (S7AreaDB, db_number, 7, 1)]
+        result = self.client.read_tags(tags)
+        self.assertEqual(result, [data[0:4], data[50:100], data[7:8]])
+
+    def test_read_plan(self):
+        data = bytearray(range(100))
+        self.client.db_write(db_number, 0, data)
+        tags = [(S7AreaDB, db_number, i * 10, 2) for i in range(10)]
+        plan = snap7.planner.ReadPlan(tags, self.client.get_pdu_length(),
+                                      max_gap=8)
+        self.assertEqual(len(plan.spans), 1)
+        result = self.client.read_plan(plan)
+        self.assertEqual(result, [data[i * 10:i * 10 + 2] for i in range(10)])
+
+    def test_write_multi_vars(self):
+        data = bytearray([1, 2, 3, 4])
+        items = (S7DataItem * 1)()
+        items[0].Area = S7AreaDB
+        items[0].WordLen = S7WLByte
+        items[0].DBNumber = db_number
+        items[0].Start = 20
+        items[0].Amount = len(data)
+        items[0].pData = ctypes.cast((ctypes.c_uint8 * 4).from_buffer(data),
+                                     ctypes.POINTER(ctypes.c_uint8))
+        self.client.write_multi_vars(items)
+        self.assertEqual(items[0].Result, 0)
+        self.assertEqual(self.client.db_read(db_number, 20, 4), data)
+
+    def test_write_tags(self):
+        self.client.db_write(db_number, 0, bytearray(100))
+        tags = [(S7AreaDB, db_number, 0, bytearray([1, 2])),
+                (S7AreaDB, db_number, 10, bytearray(range(80))),
+                (S7AreaDB, db_number, 95, bytearray([3]))]
+        self.assertEqual(self.client.write_tags(tags), [0, 0, 0])
+        data = self.client.db_read(db_number, 0, 100)
+        self.assertEqual(data[0:2], bytearray([1, 2]))
+        self.assertEqual(data[10:90], bytearray(range(80)))
+        self.assertEqual(data[95], 3)
+
     def test_upload(self):
         """
         this raises an exception due to missing authorization? maybe not
@@ -148,6 +259,36 @@ class TestClient(unittest.TestCase):
         start = 1
         self.client.read_area(area, dbnumber, start, amount)
 
+    def test_read_area_chunked(self):
+        area = snap7.snap7types.areas.DB
+        data = bytearray(range(100))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        result = self.client.read_area_chunked(area, db_number, 0, 100,
+                                               chunk_size=16)
+        self.assertEqual(data, result)
+
+    def test_db_read_chunked(self):
+        data = bytearray(range(100))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        result = self.client.db_read_chunked(db_number, 10, 90)
+        self.assertEqual(data[10:], result)
+
+    def test_read_area_chunked_clients(self):
+        data = bytearray(range(200))
+        self.client.db_write(db_number=db_number, start=0, data=data)
+        others = [snap7.client.Client() for _ in range(2)]
+        for other in others:
+            other.connect(ip, rack, slot, tcpport)
+        try:
+            result = self.client.db_read_chunked(db_number, 0, 200,
+                                                 chunk_size=16,
+                                                 clients=others)
+        finally:
+            for other in others:
+                other.disconnect()
+                other.destroy()
+        self.assertEqual(data, result)
+
     def test_write_area(self):
         area = snap7.snap7types.areas.DB
         dbnumber = 1
@@ -324,6 +465,15 @@ class TestClient(unittest.TestCase):
         pduRequested = self.client.get_param(10)
         pduSize = self.client.get_pdu_length()
         self.assertEqual(pduSize, pduRequested)
+
+    def test_pdu_length_cached(self):
+        pdu_length = self.client.get_pdu_length()
+        self.assertEqual(self.client._pdu_length, pdu_length)
+        self.assertEqual(self.client.get_pdu_length(), pdu_length)
+        self.client.disconnect()
+        self.assertEqual(self.client._pdu_length, None)
+        self.client.connect(ip, rack, slot, tcpport)
+        self.assertEqual(self.client.get_pdu_length(), pdu_length)
     
     def test_get_cpu_info(self):
         expected = (
@@ -339,6 +489,29 @@ class TestClient(unittest.TestCase):
         
 
 
+class TestByteBuffer(unittest.TestCase):
+
+    def test_size(self):
+        buffer = bytearray(10)
+        cdata, size = byte_buffer(buffer, offset=4)
+        self.assertEqual(size, 6)
+        cdata[0] = 7
+        self.assertEqual(buffer[4], 7)
+        self.assertEqual(byte_buffer(buffer, 2)[1], 2)
+
+    @unittest.skipIf(six.PY2, "memoryviews can't be shared on python 2")
+    def test_memoryview(self):
+        buffer = bytearray(10)
+        cdata, size = byte_buffer(memoryview(buffer)[2:])
+        self.assertEqual(size, 8)
+        cdata[0] = 7
+        self.assertEqual(buffer[2], 7)
+
+    @unittest.skipIf(not six.PY2, "python 2 only")
+    def test_memoryview_py2(self):
+        self.assertRaises(TypeError, byte_buffer, memoryview(bytearray(4)))
+
+
 class TestClientBeforeConnect(unittest.TestCase):
     """
     Test suite of items that should run without an open connection.
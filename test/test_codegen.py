@@ -0,0 +1,75 @@
+import unittest
+
+from snap7 import codegen, util
+
+
+test_spec = """
+
+4	    ID	         INT
+6	    NAME	 STRING[4]
+
+12.0	testbool1    BOOL
+12.1	testbool2    BOOL
+12.7	testbool8    BOOL
+13      testReal     REAL
+17      testDword    DWORD
+"""
+
+_bytearray = bytearray([
+    0, 0,                                          # test int
+    4, 4, ord('t'), ord('e'), ord('s'), ord('t'),  # test string
+    3,                                             # test bools
+    68, 78, 211, 51,                               # test real
+    255, 255, 255, 255                             # test dword
+    ])
+
+
+class TestCodegen(unittest.TestCase):
+
+    def test_accessor(self):
+        Row = codegen.accessor(test_spec, 'Row')
+        self.assertTrue(codegen.accessor(test_spec, 'Row') is Row)
+
+        data = bytearray(_bytearray * 2)
+        row = Row(data, len(_bytearray) - 4)
+        db_row = util.DB_Row(data, test_spec,
+                             db_offset=len(_bytearray), layout_offset=4)
+        self.assertEqual(row.export(), db_row.export())
+
+        row.ID = 7
+        row.NAME = 'abc'
+        row.testbool1 = False
+        row.testbool8 = True
+        row.testReal = 1.5
+        row.testDword = 9
+        self.assertEqual(db_row['ID'], 7)
+        self.assertEqual(db_row['NAME'], 'abc')
+        self.assertEqual(db_row['testbool1'], False)
+        self.assertEqual(db_row['testbool8'], True)
+        self.assertEqual(db_row['testbool2'], True)
+        self.assertEqual(db_row['testReal'], 1.5)
+        self.assertEqual(db_row['testDword'], 9)
+        # the first row is untouched
+        self.assertEqual(data[:len(_bytearray)], _bytearray)
+        self.assertRaises(AttributeError, setattr, row, 'x', 1)
+        self.assertRaises(ValueError, setattr, row, 'NAME', 'abcde')
+        self.assertEqual(db_row['NAME'], 'abc')
+
+    def test_source(self):
+        spec = "0 ScaleOut.High REAL\n4 class INT\n"
+        code = codegen.source(spec, 'Scale')
+        namespace = {}
+        exec(compile(code, 'scale', 'exec'), namespace)
+        row = namespace['Scale'](bytearray(6))
+        row.ScaleOut_High = 2.0
+        row.class_ = 3
+        self.assertEqual(row.export(), {'ScaleOut.High': 2.0, 'class': 3})
+
+    def test_invalid_names(self):
+        self.assertRaises(ValueError, codegen.source, test_spec, 'my row')
+        spec = "0 a.b INT\n2 a_b INT\n"
+        self.assertRaises(ValueError, codegen.source, spec)
+
+
+if __name__ == '__main__':
+    unittest.main()
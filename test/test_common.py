@@ -0,0 +1,99 @@
+import ctypes
+import unittest
+
+from snap7 import common, prototypes
+from snap7.snap7exceptions import (Snap7Exception, Snap7LibraryError,
+                                   TcpError, IsoError, S7Error)
+
+
+class TestCommon(unittest.TestCase):
+
+    def setUp(self):
+        # texts as the library would return them
+        self.texts = {
+            0x02000000: b' CLI : Job Timeout',
+            0x0001274d: b'TCP : Connection refused ISO : Connect error',
+            0x00030000: b' ISO : Invalid PDU received',
+        }
+        common.error_texts['client'].update(self.texts)
+
+    def tearDown(self):
+        common.error_texts['client'].clear()
+
+    def test_error_text(self):
+        self.assertEqual(common.error_text(0x02000000, context="client"),
+                         b' CLI : Job Timeout')
+
+    def test_error_name(self):
+        self.assertEqual(common.error_name(0x02000000), 'errCliJobTimeout')
+        self.assertEqual(common.error_name(0x0001274d), 'errIsoConnect')
+        self.assertEqual(common.error_name(0x00300000, context="server"),
+                         'errSrvAreaAlreadyExists')
+        self.assertEqual(common.error_name(0x00000001), None)
+
+    def test_check_error(self):
+        common.check_error(0)
+        with self.assertRaises(S7Error) as raised:
+            common.check_error(0x02000000)
+        error = raised.exception
+        self.assertTrue(isinstance(error, Snap7Exception))
+        self.assertEqual(error.code, 0x02000000)
+        self.assertEqual(error.s7_error, 0x02000000)
+        self.assertEqual(error.name, 'errCliJobTimeout')
+        self.assertEqual(error.args, (b' CLI : Job Timeout',))
+
+        with self.assertRaises(TcpError) as raised:
+            common.check_error(0x0001274d)
+        self.assertEqual(raised.exception.tcp_error, 0x274d)
+        self.assertEqual(raised.exception.iso_error, 0x00010000)
+        self.assertRaises(IsoError, common.check_error, 0x00030000)
+        self.assertRaises(Snap7LibraryError, common.check_error, 0x00030000)
+
+
+class FakeLibrary(object):
+    """
+    Stands in for the ctypes cdll of the library, without Cli_GetExecTime.
+    """
+    class Function(object):
+        restype = ctypes.c_int
+        argtypes = None
+
+    def __getattr__(self, name):
+        if name == 'Cli_GetExecTime':
+            raise AttributeError(name)
+        function = self.Function()
+        setattr(self, name, function)
+        return function
+
+
+class TestPrototypes(unittest.TestCase):
+
+    def test_bind(self):
+        library = FakeLibrary()
+        bound = prototypes.bind(library)
+        self.assertTrue('Cli_DBRead' in bound)
+        self.assertFalse('Cli_GetExecTime' in bound)
+        self.assertEqual(len(bound), len(prototypes.prototypes) - 1)
+        self.assertEqual(library.Cli_Create.restype, ctypes.c_void_p)
+        self.assertEqual(library.Cli_DBRead.argtypes,
+                         (ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                          ctypes.c_int, ctypes.c_void_p))
+
+    def test_argtypes(self):
+        """
+        The argument types accept what the wrappers pass.
+        """
+        argtypes = prototypes.prototypes['Cli_ReadMultiVars'][1]
+        items = (ctypes.c_int * 4)()
+        for argtype, value in zip(argtypes, (ctypes.c_void_p(),
+                                             ctypes.byref(items),
+                                             ctypes.c_int32(4))):
+            argtype.from_param(value)
+        callback = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_int,
+                                    ctypes.c_int)(lambda *args: None)
+        ctypes.c_void_p.from_param(callback)
+        ctypes.c_void_p.from_param(ctypes.byref(ctypes.c_void_p()))
+
+
+if __name__ == '__main__':
+    unittest.main()
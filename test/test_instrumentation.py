@@ -0,0 +1,145 @@
+import unittest
+
+from snap7.instrumentation import (Histogram, Instrumentation, bucket_bounds,
+                                   bucket_index, methods)
+from snap7.snap7exceptions import Snap7Exception
+from snap7.snap7types import S7DataItem
+
+
+class FakeClient(object):
+    """
+    Runs the data transfer methods without a library.
+    """
+    def __init__(self):
+        self.calls = []
+
+    def db_read_into(self, buffer, db_number, start, size=None):
+        self.calls.append('db_read_into')
+        return len(buffer) if size is None else size
+
+    def db_write(self, db_number, start, data):
+        self.calls.append('db_write')
+        if db_number < 0:
+            raise Snap7Exception('invalid db')
+
+    def read_multi_vars(self, items):
+        return 0, items
+
+    def get_exec_time(self):
+        return 3
+
+
+def plain(self, *args, **kwargs):
+    return 0
+
+
+for name in methods:
+    if not hasattr(FakeClient, name):
+        setattr(FakeClient, name, plain)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets(self):
+        for value in list(range(100)) + [1000, 123456, 2 ** 40 + 5]:
+            low, high = bucket_bounds(bucket_index(value))
+            self.assertTrue(low <= value < high)
+            # within 25%
+            self.assertTrue(high - low <= max(value // 4, 1))
+        indexes = [bucket_index(value) for value in range(4096)]
+        self.assertEqual(indexes, sorted(indexes))
+
+    def test_percentile(self):
+        histogram = Histogram()
+        self.assertEqual(histogram.percentile(50), 0)
+        for value in range(1, 101):
+            histogram.record(value)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.max, 100)
+        self.assertTrue(50 <= histogram.percentile(50) <= 63)
+        self.assertEqual(histogram.percentile(100), 100)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['mean'], 50.5)
+
+    def test_cumulative(self):
+        histogram = Histogram()
+        for value in (1, 3, 5, 100):
+            histogram.record(value)
+        buckets = histogram.cumulative()
+        self.assertEqual(buckets[0], (1, 0))
+        self.assertEqual(buckets[-1][1], 4)
+        self.assertTrue(buckets[-1][0] > 100)
+        counts = [count for bound, count in buckets]
+        self.assertEqual(counts, sorted(counts))
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.instrumentation = Instrumentation()
+        self.instrumentation.install(self.client)
+
+    def test_counts(self):
+        self.client.db_read_into(bytearray(10), 1, 0)
+        self.client.db_read_into(bytearray(10), 1, 0, 4)
+        self.client.db_write(1, 0, bytearray(6))
+        self.client.db_write(1, 0, data=bytearray(2))
+        self.assertEqual(self.client.calls, ['db_read_into'] * 2 +
+                         ['db_write'] * 2)
+
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(sorted(snapshot), ['db_read_into', 'db_write'])
+        self.assertEqual(snapshot['db_read_into']['calls'], 2)
+        self.assertEqual(snapshot['db_read_into']['bytes'], 14)
+        self.assertEqual(snapshot['db_write']['bytes'], 8)
+        self.assertEqual(snapshot['db_write']['exec_time']['count'], 2)
+        self.assertEqual(snapshot['db_write']['exec_time']['max'], 3000)
+
+    def test_multi_vars(self):
+        items = (S7DataItem * 2)()
+        items[0].Amount = 4
+        items[1].Amount = 2
+        self.client.read_multi_vars(items)
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot['read_multi_vars']['bytes'], 6)
+
+    def test_errors(self):
+        self.assertRaises(Snap7Exception, self.client.db_write, -1, 0,
+                          bytearray(1))
+        stats = self.instrumentation.methods['db_write']
+        self.assertEqual((stats.calls, stats.errors, stats.bytes), (1, 1, 0))
+        self.assertEqual(stats.latency.count, 1)
+
+    def test_async_no_exec_time(self):
+        self.client.as_db_read_into(bytearray(2), 1, 0)
+        stats = self.instrumentation.methods['as_db_read_into']
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.exec_time.count, 0)
+
+    def test_uninstall(self):
+        self.instrumentation.uninstall(self.client)
+        self.assertFalse('db_read_into' in vars(self.client))
+        self.client.db_read_into(bytearray(1), 1, 0)
+        self.assertEqual(self.instrumentation.snapshot(), {})
+
+    def test_reset(self):
+        self.client.db_write(1, 0, bytearray(1))
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.methods['db_write'].calls, 0)
+
+    def test_prometheus(self):
+        self.client.db_read_into(bytearray(10), 1, 0)
+        text = self.instrumentation.prometheus(labels={'plc': 'a'})
+        self.assertTrue('# TYPE snap7_client_calls_total counter' in text)
+        self.assertTrue('snap7_client_bytes_total{method="db_read_into",'
+                        'plc="a"} 10' in text)
+        self.assertTrue('snap7_client_latency_seconds_bucket{method='
+                        '"db_read_into",plc="a",le="+Inf"} 1' in text)
+        self.assertTrue('snap7_client_exec_time_seconds_count{method='
+                        '"db_read_into",plc="a"} 1' in text)
+        self.assertFalse('db_write' in text.split('histogram')[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import ctypes
+import unittest
+
+from snap7 import planner, util
+from snap7.client import Client
+from snap7.snap7types import S7AreaDB, S7AreaMK
+
+
+class FakeClient(Client):
+    """
+    Serves multi variable reads of DB 1 from ``data``, without a library.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.set_fast_mode(False)
+
+    def get_pdu_length(self):
+        return 240
+
+    def read_multi_vars(self, items):
+        for item in items:
+            data = bytes(self.data[item.Start:item.Start + item.Amount])
+            ctypes.memmove(item.pData, data, item.Amount)
+            item.Result = 0
+        return 0, items
+
+
+class TestReadPlanner(unittest.TestCase):
+
+    def assertCovers(self, tags, requests):
+        """every byte of every tag is read exactly once"""
+        for index, tag in enumerate(tags):
+            pieces = [p for r in requests for p in r if p.tag == index]
+            pieces.sort(key=lambda p: p.offset)
+            offset = 0
+            for piece in pieces:
+                self.assertEqual(piece.offset, offset)
+                self.assertEqual(piece.start, tag[2] + offset)
+                self.assertEqual(piece.area, tag[0])
+                self.assertEqual(piece.dbnumber, tag[1])
+                offset += piece.size
+            self.assertEqual(offset, tag[3])
+
+    def assertFits(self, requests, pdu_length):
+        for request in requests:
+            self.assertTrue(len(request) <= planner.max_read_items(pdu_length))
+            answer = planner.read_answer_header + sum(
+                planner.read_item_cost(p.size) for p in request)
+            self.assertTrue(answer <= pdu_length)
+
+    def test_single_request(self):
+        tags = [(S7AreaDB, 1, 0, 4), (S7AreaDB, 1, 4, 4), (S7AreaMK, 0, 8, 2)]
+        requests = planner.plan_reads(tags, 480)
+        self.assertEqual(len(requests), 1)
+        self.assertCovers(tags, requests)
+
+    def test_item_limit(self):
+        tags = [(S7AreaDB, 1, i * 2, 2) for i in range(45)]
+        requests = planner.plan_reads(tags, 480)
+        self.assertEqual(len(requests), 3)
+        self.assertCovers(tags, requests)
+        self.assertFits(requests, 480)
+
+    def test_pdu_limit(self):
+        tags = [(S7AreaDB, 1, i * 100, 100) for i in range(10)]
+        requests = planner.plan_reads(tags, 240)
+        self.assertCovers(tags, requests)
+        self.assertFits(requests, 240)
+        self.assertEqual(len(requests), 5)
+
+    def test_split_big_tag(self):
+        tags = [(S7AreaDB, 1, 0, 1000), (S7AreaDB, 2, 0, 3)]
+        requests = planner.plan_reads(tags, 240)
+        self.assertCovers(tags, requests)
+        self.assertFits(requests, 240)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, planner.plan_reads,
+                          [(S7AreaDB, 1, 0, 0)], 480)
+        self.assertRaises(ValueError, planner.plan_reads,
+                          [(S7AreaDB, 1, 0, 1)], 10)
+
+
+class TestWritePlanner(unittest.TestCase):
+
+    def test_plan_writes(self):
+        tags = [(S7AreaDB, 1, i * 10, bytearray(10)) for i in range(30)]
+        tags.append((S7AreaDB, 2, 0, bytearray(1000)))
+        requests = planner.plan_writes(tags, 480)
+        written = [0] * len(tags)
+        for request in requests:
+            self.assertTrue(len(request) <= planner.max_vars)
+            size = planner.write_request_header + sum(
+                planner.write_item_cost(p.size) for p in request)
+            self.assertTrue(size <= 480)
+            for piece in request:
+                self.assertEqual(piece.start, tags[piece.tag][2] + piece.offset)
+                written[piece.tag] += piece.size
+        self.assertEqual(written, [len(tag[3]) for tag in tags])
+
+    def test_item_limit(self):
+        tags = [(S7AreaDB, 1, i, bytearray(1)) for i in range(21)]
+        self.assertEqual(len(planner.plan_writes(tags, 960)), 2)
+
+
+class TestCoalesce(unittest.TestCase):
+
+    def test_adjacent(self):
+        tags = [(S7AreaDB, 1, 4, 4), (S7AreaDB, 1, 0, 4), (S7AreaDB, 1, 2, 1)]
+        spans, locations = planner.coalesce(tags)
+        self.assertEqual(spans, [(S7AreaDB, 1, 0, 8)])
+        self.assertEqual(locations, [(0, 4), (0, 0), (0, 2)])
+
+    def test_gap(self):
+        tags = [(S7AreaDB, 1, 0, 2), (S7AreaDB, 1, 12, 2)]
+        spans, locations = planner.coalesce(tags, max_gap=9)
+        self.assertEqual(len(spans), 2)
+        spans, locations = planner.coalesce(tags, max_gap=10)
+        self.assertEqual(spans, [(S7AreaDB, 1, 0, 14)])
+        self.assertEqual(locations, [(0, 0), (0, 12)])
+
+    def test_areas_not_merged(self):
+        tags = [(S7AreaDB, 1, 0, 2), (S7AreaDB, 2, 2, 2), (S7AreaMK, 0, 4, 2)]
+        spans, locations = planner.coalesce(tags, max_gap=100)
+        self.assertEqual(len(spans), 3)
+
+    def test_read_plan(self):
+        tags = [(S7AreaDB, 1, i * 10, 2) for i in range(40)]
+        plan = planner.ReadPlan(tags, 480)
+        self.assertEqual(len(plan.spans), 40)
+        self.assertEqual(len(plan.requests), 2)
+        self.assertEqual(plan.read_bytes, plan.tag_bytes)
+
+        plan = planner.ReadPlan(tags, 480, planner.read_item_overhead)
+        self.assertEqual(len(plan.spans), 1)
+        self.assertEqual(len(plan.requests), 1)
+        self.assertEqual(plan.read_bytes, 392)
+        self.assertEqual(plan.tag_bytes, 80)
+        self.assertTrue('requests: 1' in str(plan))
+
+
+class TestReadTags(unittest.TestCase):
+
+    def test_util_getters(self):
+        data = bytearray(20)
+        util.set_int(data, 2, 1234)
+        util.set_real(data, 10, 1.5)
+        util.set_bool(data, 16, 3, True)
+        client = FakeClient(data)
+        values = client.read_tags([(S7AreaDB, 1, 2, 2), (S7AreaDB, 1, 10, 4),
+                                   (S7AreaDB, 1, 16, 1)], max_gap=8)
+        self.assertEqual(util.get_int(values[0], 0), 1234)
+        self.assertEqual(util.get_real(values[1], 0), 1.5)
+        self.assertTrue(util.get_bool(values[2], 0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
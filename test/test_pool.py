@@ -0,0 +1,174 @@
+import threading
+import time
+import unittest
+
+from snap7.pool import ClientPool, MultiPlcReader
+from snap7.snap7exceptions import Snap7Exception
+
+
+class FakeClient(object):
+    """
+    Stands in for snap7.client.Client, so the pool logic is tested without a
+    PLC.
+    """
+    created = 0
+    fail_connect = False
+
+    def __init__(self):
+        FakeClient.created += 1
+        self.connected = False
+        self.destroyed = False
+        self.connection_type = None
+
+    def set_connection_type(self, connection_type):
+        self.connection_type = connection_type
+
+    def connect(self, address, rack, slot, tcpport=102):
+        if FakeClient.fail_connect:
+            raise Snap7Exception("connect failed")
+        self.connected = True
+
+    def get_connected(self):
+        return self.connected
+
+    def disconnect(self):
+        self.connected = False
+
+    def destroy(self):
+        self.destroyed = True
+
+    def read_tags(self, tags):
+        time.sleep(0.05)
+        return [bytearray(tag[3]) for tag in tags]
+
+
+class TestClientPool(unittest.TestCase):
+
+    def setUp(self):
+        FakeClient.created = 0
+        FakeClient.fail_connect = False
+        self.pool = ClientPool(max_per_endpoint=2, client_factory=FakeClient)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuse(self):
+        with self.pool.lease('10.0.0.1', 0, 2, connection_type=2) as client:
+            self.assertTrue(client.connected)
+            self.assertEqual(client.connection_type, 2)
+        with self.pool.lease('10.0.0.1', 0, 2, connection_type=2) as again:
+            self.assertTrue(again is client)
+        self.assertEqual(FakeClient.created, 1)
+
+    def test_lease_many(self):
+        with self.pool.lease_many('10.0.0.1', 0, 2, 4) as clients:
+            # capped by the handles per endpoint
+            self.assertEqual(len(clients), 2)
+            self.assertRaises(Snap7Exception, self.pool.acquire, '10.0.0.1',
+                              0, 2, timeout=0.01)
+        with self.pool.lease('10.0.0.1', 0, 2):
+            with self.pool.lease_many('10.0.0.1', 0, 2, 4) as clients:
+                self.assertEqual(len(clients), 1)
+        self.assertEqual(self.pool.stats()[('10.0.0.1', 0, 2, 1, 102)],
+                         {'handles': 2, 'idle': 2})
+
+    def test_lease_many_failed_connect(self):
+        client = self.pool.acquire('10.0.0.1', 0, 2)
+        FakeClient.fail_connect = True
+        self.pool.release(client, '10.0.0.1', 0, 2)
+        with self.pool.lease_many('10.0.0.1', 0, 2, 4) as clients:
+            self.assertEqual(clients, [client])
+        FakeClient.fail_connect = False
+        # a failed extra handle does not hold the endpoint back
+        with self.pool.lease_many('10.0.0.1', 0, 2, 4) as clients:
+            self.assertEqual(len(clients), 2)
+        self.assertEqual(self.pool.stats()[('10.0.0.1', 0, 2, 1, 102)],
+                         {'handles': 2, 'idle': 2})
+
+    def test_endpoints(self):
+        with self.pool.lease('10.0.0.1', 0, 2):
+            with self.pool.lease('10.0.0.2', 0, 2):
+                pass
+        self.assertEqual(FakeClient.created, 2)
+        self.assertEqual(len(self.pool.stats()), 2)
+
+    def test_limit(self):
+        first = self.pool.acquire('10.0.0.1', 0, 2)
+        second = self.pool.acquire('10.0.0.1', 0, 2)
+        self.assertRaises(Snap7Exception, self.pool.acquire, '10.0.0.1', 0, 2,
+                          timeout=0.01)
+
+        def give_back():
+            time.sleep(0.05)
+            self.pool.release(first, '10.0.0.1', 0, 2)
+
+        threading.Thread(target=give_back).start()
+        third = self.pool.acquire('10.0.0.1', 0, 2, timeout=5)
+        self.assertTrue(third is first)
+        self.pool.release(second, '10.0.0.1', 0, 2)
+        self.pool.release(third, '10.0.0.1', 0, 2)
+        self.assertEqual(FakeClient.created, 2)
+
+    def test_dead_connection(self):
+        with self.pool.lease('10.0.0.1', 0, 2) as client:
+            client.connected = False
+        self.assertTrue(client.destroyed)
+        with self.pool.lease('10.0.0.1', 0, 2) as other:
+            self.assertFalse(other is client)
+        stats = self.pool.stats()
+        self.assertEqual(list(stats.values()), [{'handles': 1, 'idle': 1}])
+
+    def test_failed_connect(self):
+        FakeClient.fail_connect = True
+        self.assertRaises(Snap7Exception, self.pool.acquire, '10.0.0.1', 0, 2)
+        FakeClient.fail_connect = False
+        # the endpoint is not retried within the retry interval
+        self.assertRaises(Snap7Exception, self.pool.acquire, '10.0.0.1', 0, 2)
+        self.pool.retry_interval = 0
+        client = self.pool.acquire('10.0.0.1', 0, 2)
+        self.assertTrue(client.connected)
+        self.pool.release(client, '10.0.0.1', 0, 2)
+
+    def test_close(self):
+        client = self.pool.acquire('10.0.0.1', 0, 2)
+        self.pool.close()
+        self.pool.release(client, '10.0.0.1', 0, 2)
+        self.assertTrue(client.destroyed)
+        self.assertRaises(Snap7Exception, self.pool.acquire, '10.0.0.1', 0, 2)
+
+
+class TestMultiPlcReader(unittest.TestCase):
+
+    def setUp(self):
+        FakeClient.created = 0
+        FakeClient.fail_connect = False
+        pool = ClientPool(client_factory=FakeClient, retry_interval=0)
+        self.reader = MultiPlcReader(workers=10, pool=pool)
+
+    def tearDown(self):
+        self.reader.close()
+        self.reader.pool.close()
+
+    def test_read(self):
+        tags = [(0x84, 1, 0, 4), (0x84, 1, 10, 2)]
+        jobs = [(('10.0.0.%s' % i, 0, 2), tags) for i in range(10)]
+        start = time.time()
+        results = self.reader.read(jobs)
+        # the PLCs are read in parallel
+        self.assertTrue(time.time() - start < 0.4)
+        self.assertEqual(len(results), 10)
+        for i, result in enumerate(results):
+            self.assertEqual(result.endpoint.address, '10.0.0.%s' % i)
+            self.assertEqual(result.error, None)
+            self.assertEqual([len(v) for v in result.values], [4, 2])
+            self.assertTrue(result.elapsed >= 0.05)
+
+    def test_error(self):
+        FakeClient.fail_connect = True
+        results = self.reader.read([(('10.0.0.1', 0, 2), [(0x84, 1, 0, 4)])])
+        self.assertTrue(isinstance(results[0].error, Snap7Exception))
+        self.assertEqual(results[0].values, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import unittest
+
+from snap7.scheduler import Poller
+from snap7.snap7types import S7AreaDB
+
+
+class FakeClient(object):
+    """
+    Stands in for snap7.client.Client, returns zeros for every tag.
+    """
+    def __init__(self):
+        self.plans = []
+
+    def get_pdu_length(self):
+        return 480
+
+    def read_plan(self, plan):
+        self.plans.append(plan)
+        return [memoryview(bytearray(tag.size)) for tag in plan.tags]
+
+
+class TestPoller(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.poller = Poller(self.client)
+        self.poller.add('fast1', (S7AreaDB, 1, 0, 4), 0.1)
+        self.poller.add('fast2', (S7AreaDB, 1, 4, 2), 0.1)
+        self.poller.add('slow', (S7AreaDB, 2, 0, 10), 1)
+
+    def test_merge_due(self):
+        values = self.poller.poll(now=0)
+        self.assertEqual(sorted(values), ['fast1', 'fast2', 'slow'])
+        self.assertEqual(len(self.client.plans), 1)
+        self.assertEqual(len(self.client.plans[0].requests), 1)
+
+    def test_intervals(self):
+        self.poller.poll(now=0)
+        self.assertEqual(self.poller.poll(now=0.05), {})
+        self.assertEqual(sorted(self.poller.poll(now=0.1)),
+                         ['fast1', 'fast2'])
+        self.assertEqual(sorted(self.poller.poll(now=1.0)),
+                         ['fast1', 'fast2', 'slow'])
+
+    def test_plan_reuse(self):
+        self.poller.poll(now=0)
+        self.poller.poll(now=0.1)
+        self.poller.poll(now=0.2)
+        self.assertTrue(self.client.plans[1] is self.client.plans[2])
+
+    def test_overruns(self):
+        self.poller.poll(now=0)
+        self.poller.poll(now=0.35)
+        stats = self.poller.stats()[0.1]
+        self.assertEqual(stats['cycles'], 2)
+        self.assertEqual(stats['overruns'], 2)
+        self.assertAlmostEqual(stats['max_jitter'], 0.25)
+        self.assertEqual(self.poller.stats()[1]['overruns'], 0)
+
+    def test_remove(self):
+        self.poller.remove('slow')
+        self.assertEqual(sorted(self.poller.poll(now=0)), ['fast1', 'fast2'])
+        self.assertRaises(KeyError, self.poller.remove, 'slow')
+
+    def test_run(self):
+        ticks = []
+
+        def callback(values):
+            ticks.append(values)
+            if len(ticks) == 3:
+                self.poller.stop()
+
+        thread = threading.Thread(target=self.poller.run, args=(callback,))
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(ticks), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
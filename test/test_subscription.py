@@ -0,0 +1,96 @@
+import unittest
+
+from snap7 import util
+from snap7.scheduler import Poller
+from snap7.snap7types import S7AreaDB
+from snap7.subscription import Subscription, Subscriber
+
+
+test_spec = """
+
+4	    ID	         INT
+6	    NAME	 STRING[4]
+
+12.0	testbool1    BOOL
+12.1	testbool2    BOOL
+13      testReal     REAL
+"""
+
+_bytearray = bytearray([
+    0, 0,                                          # test int
+    4, 4, ord('t'), ord('e'), ord('s'), ord('t'),  # test string
+    1,                                             # test bools
+    68, 78, 211, 51,                               # test real
+    ])
+
+
+class FakeClient(object):
+    """
+    Stands in for snap7.client.Client, returns the same buffer for every
+    tag.
+    """
+    data = _bytearray
+
+    def get_pdu_length(self):
+        return 480
+
+    def read_plan(self, plan):
+        return [memoryview(self.data) for tag in plan.tags]
+
+
+class TestSubscription(unittest.TestCase):
+
+    def test_first_update(self):
+        subscription = Subscription('row', test_spec, layout_offset=4)
+        changes = subscription.update(_bytearray)
+        self.assertEqual([c.field for c in changes],
+                         ['ID', 'NAME', 'testbool1', 'testbool2', 'testReal'])
+        self.assertEqual(changes[1].value, 'test')
+
+    def test_changed_fields(self):
+        subscription = Subscription('row', test_spec, layout_offset=4)
+        subscription.update(_bytearray)
+        self.assertEqual(subscription.update(_bytearray), [])
+
+        data = bytearray(_bytearray)
+        util.set_bool(data, 8, 1, True)
+        util.set_int(data, 0, 12)
+        changes = subscription.update(data)
+        self.assertEqual([(c.field, c.value) for c in changes],
+                         [('ID', 12), ('testbool2', True)])
+
+    def test_raw(self):
+        subscription = Subscription('raw')
+        self.assertEqual(len(subscription.update(b'\x00\x01')), 1)
+        self.assertEqual(subscription.update(b'\x00\x01'), [])
+        change, = subscription.update(b'\x00\x02')
+        self.assertEqual(change.value, bytearray(b'\x00\x02'))
+
+
+class TestSubscriber(unittest.TestCase):
+
+    def test_dispatch(self):
+        client = FakeClient()
+        received = []
+        subscriber = Subscriber(Poller(client), callback=received.extend)
+        subscriber.subscribe('row', (S7AreaDB, 1, 0, len(_bytearray)), 0.1,
+                             test_spec, layout_offset=4)
+        subscriber.dispatch(subscriber.poller.poll(now=0))
+        self.assertEqual(len(received), 5)
+
+        client.data = bytearray(_bytearray)
+        util.set_real(client.data, 9, 1.5)
+        subscriber.dispatch(subscriber.poller.poll(now=0.1))
+        self.assertEqual(received[-1], ('row', 'testReal', 1.5))
+        self.assertEqual(len(received), 6)
+
+    def test_changes(self):
+        subscriber = Subscriber(Poller(FakeClient()))
+        subscriber.subscribe('raw', (S7AreaDB, 1, 0, 4), 0.1)
+        subscriber.dispatch(subscriber.poller.poll(now=0))
+        changes = list(subscriber.changes(timeout=0.01))
+        self.assertEqual([c.tag for c in changes], ['raw'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
+import ctypes
 import unittest
 import re
+import struct
 
 from snap7 import util
+from snap7.client import byte_buffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 test_spec = """
@@ -138,6 +146,428 @@ class TestS7util(unittest.TestCase):
         self.assertTrue('testbool1' in data)
         self.assertTrue(data['testbool5'] == 0)
 
+    def test_layout(self):
+        layout = util.Layout(test_spec)
+        self.assertEqual(len(layout), 12)
+        self.assertTrue('testReal' in layout)
+        field = layout.fields['testbool4']
+        self.assertEqual((field.byte_index, field.mask), (12, 8))
+        self.assertEqual(layout.fields['NAME'].size, 6)
+        self.assertRaises(ValueError, util.Layout, "4 x LREAL")
+
+    def test_shared_layout(self):
+        test_array = bytearray(_bytearray * 10)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=len(_bytearray),
+                          size=10,
+                          layout_offset=4,
+                          db_offset=0)
+        layouts = set(id(row._layout) for i, row in test_db)
+        self.assertEqual(layouts, set([id(test_db.layout)]))
+
+        test_db[3]['ID'] = 7
+        test_db[3]['testbool8'] = 1
+        self.assertEqual(test_db[3]['ID'], 7)
+        self.assertEqual(test_db[2]['ID'], 0)
+        self.assertEqual(test_db[3]['testbool8'], 1)
+        self.assertEqual(test_array[3 * len(_bytearray) + 8], 128 + 15)
+
+    def test_row_with_layout(self):
+        test_array = bytearray(_bytearray)
+        row = util.DB_Row(test_array, util.Layout(test_spec), layout_offset=4)
+        self.assertEqual(row['NAME'], 'test')
+        self.assertEqual(row['testDword'], 4294967295)
+
+    def test_set_bool_bits(self):
+        test_array = bytearray([0b00000101])
+        util.set_bool(test_array, 0, 0, True)
+        self.assertEqual(test_array[0], 0b00000101)
+        util.set_bool(test_array, 0, 1, True)
+        util.set_bool(test_array, 0, 2, False)
+        self.assertEqual(test_array[0], 0b00000011)
+
+    def test_bits(self):
+        test_array = bytearray([0, 0b10000001, 0b00000110, 0xff])
+        bits = util.get_bits(test_array, 1, 2)
+        self.assertEqual(len(bits), 16)
+        self.assertEqual([i for i, bit in enumerate(bits) if bit],
+                         [0, 7, 9, 10])
+        self.assertEqual(util.get_bits(memoryview(test_array), 3, 1),
+                         [True] * 8)
+
+        bits[0] = False
+        bits[12] = True
+        util.set_bits(test_array, 1, bits)
+        self.assertEqual(test_array, bytearray([0, 0b10000000, 0b00010110,
+                                                0xff]))
+        # bits after the list are kept
+        util.set_bits(test_array, 3, [False, False, True])
+        self.assertEqual(test_array[3], 0b11111100)
+
+    def test_unpack_bools(self):
+        spec = "0.0 a BOOL\n0.7 b BOOL\n1 c INT\n3.2 d BOOL\n"
+        layout = util.Layout(spec)
+        data = bytearray([0b10000000, 0, 5, 0b100])
+        self.assertEqual(layout.unpack_from(data),
+                         (False, True, 5, True))
+        layout = util.Layout("0.3 a BOOL\n")
+        self.assertEqual(layout.unpack_from(bytearray([8])), (True,))
+
+    def test_string_codec(self):
+        test_array = bytearray(b'\x06\x03abcdef')
+        util.set_string(test_array, 0, 'xy', 6)
+        self.assertEqual(test_array, bytearray(b'\x06\x02xy    '))
+        util.set_string(test_array, 0, '', 6)
+        self.assertEqual(test_array, bytearray(b'\x06\x00      '))
+        util.set_string(test_array, 0, u'caf\xe9', 6)
+        self.assertEqual(util.get_string(test_array, 0, 6), u'caf\xe9')
+        self.assertEqual(test_array[2:6], bytearray(b'caf\xe9'))
+        self.assertRaises(ValueError, util.set_string, test_array, 0,
+                          u'caf\xe9', 6, 'ascii')
+        self.assertRaises(ValueError, util.set_string, test_array, 0,
+                          'abcdefg', 6)
+        self.assertEqual(util.get_string(memoryview(test_array), 0, 6),
+                         u'caf\xe9')
+
+    def test_unpack_strings(self):
+        spec = "0 a STRING[2]\n4 n INT\n6 b STRING[3]\n"
+        layout = util.Layout(spec)
+        self.assertEqual(layout.string_names, ('a', 'b'))
+        data = bytearray(b'\x02\x01x \x00\x01\x03\x03abc')
+        self.assertEqual(layout.unpack_strings(data), ('x', 'abc'))
+        test_db = util.DB(1, data * 2, layout, row_size=len(data), size=2)
+        self.assertEqual(test_db.strings(), [('x', 'abc'), ('x', 'abc')])
+
+    def test_layout_encoding(self):
+        spec = "0 a STRING[4]\n6 n INT\n"
+        data = bytearray(b'\x04\x02\xc3\xa9  \x00\x01')
+        layout = util.Layout(spec, encoding='utf-8')
+        self.assertEqual(layout.unpack_strings(data), (u'\xe9',))
+        self.assertEqual(layout.unpack_from(data), (u'\xe9', 1))
+        test_db = util.DB(1, data, spec, row_size=8, size=1,
+                          encoding='utf-8')
+        self.assertEqual(test_db.strings(), [(u'\xe9',)])
+        test_db[0]['a'] = u'\xe8'
+        self.assertEqual(data[:4], bytearray(b'\x04\x02\xc3\xa8'))
+        self.assertEqual(test_db[0]['a'], u'\xe8')
+        latin = util.DB(1, data, spec, row_size=8, size=1)
+        self.assertEqual(latin.strings(), [(u'\xc3\xa8',)])
+
+    def test_get_helpers(self):
+        test_array = bytearray(_bytearray)
+        self.assertEqual(util.get_dword(test_array, 13), 4294967295)
+        util.set_dword(test_array, 13, 12345678)
+        self.assertEqual(util.get_dword(test_array, 13), 12345678)
+        util.set_real(test_array, 9, 1.5)
+        self.assertEqual(util.get_real(test_array, 9), 1.5)
+        self.assertEqual(len(test_array), len(_bytearray))
+
+    def test_unpack_row(self):
+        test_array = bytearray(_bytearray)
+        layout = util.Layout(test_spec)
+        row = util.DB_Row(test_array, layout, layout_offset=4)
+        values = layout.unpack_from(test_array, -4)
+        self.assertEqual(values, tuple(row[name] for name in layout.names))
+        self.assertEqual(row.export()['NAME'], 'test')
+
+    def test_unpack_numbers(self):
+        spec = """
+        0   a   INT
+        2   b   REAL
+        6   c   DWORD
+        """
+        layout = util.Layout(spec.replace('        ', ''))
+        data = bytearray(struct.pack('>HfI', 3, 2.5, 7))
+        self.assertTrue(layout._direct)
+        self.assertEqual(layout.unpack_from(data), (3, 2.5, 7))
+
+    def test_unpack_overlap(self):
+        spec = "0 a INT\n1 b INT\n"
+        layout = util.Layout(spec)
+        self.assertEqual(layout.struct, None)
+        self.assertEqual(layout.unpack_from(bytearray([0, 1, 2])), (1, 258))
+
+    def test_db_export(self):
+        test_array = bytearray(_bytearray * 3)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=len(_bytearray),
+                          size=3,
+                          layout_offset=4,
+                          db_offset=0)
+        test_db[1]['ID'] = 5
+        rows = test_db.export()
+        self.assertEqual([row['ID'] for row in rows], [0, 5, 0])
+        self.assertEqual(rows[0], test_db[0].export())
+        tuples = test_db.export('tuple')
+        self.assertEqual(tuples[1][0], 5)
+        records = test_db.export('record')
+        self.assertEqual(records[2].NAME, 'test')
+        self.assertEqual(records[2].testbool1, True)
+        self.assertRaises(ValueError, test_db.export, 'xml')
+
+    def test_flush(self):
+        test_array = bytearray(_bytearray * 3)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=len(_bytearray),
+                          size=3,
+                          layout_offset=4,
+                          db_offset=0)
+        row_size = len(_bytearray)
+        client = FakeClient()
+        self.assertEqual(test_db.flush(client), [])
+        self.assertEqual(client.writes, [])
+
+        test_db[0]['ID'] = 5
+        test_db[0]['NAME'] = 'abc'
+        test_db[2]['testbool1'] = 0
+        test_db[2].set_value('12.1', 'BOOL', 0)
+        self.assertEqual(test_db.dirty_ranges(),
+                         [(0, 8), (row_size * 2 + 8, 1)])
+        self.assertEqual(test_db.flush(client),
+                         [(0, 8), (row_size * 2 + 8, 1)])
+        self.assertEqual(client.writes,
+                         [[(util.S7AreaDB, 1, 0, test_array[0:8]),
+                           (util.S7AreaDB, 1, row_size * 2 + 8,
+                            test_array[row_size * 2 + 8:row_size * 2 + 9])]])
+        self.assertEqual(test_db.dirty_ranges(), [])
+
+        # a row flushes its own changes only
+        test_db[0]['testReal'] = 1.0
+        test_db[1]['testReal'] = 1.0
+        self.assertEqual(test_db[1].flush(client), [(row_size + 9, 4)])
+        self.assertEqual(test_db.dirty_ranges(), [(9, 4)])
+
+        # failed writes stay dirty
+        client.result = 5
+        self.assertRaises(Exception, test_db.flush, client)
+        self.assertEqual(test_db.dirty_ranges(), [(9, 4)])
+
+    def test_db_read(self):
+        row_size = len(_bytearray)
+        test_db = util.DB(1, bytearray(2 + row_size * 3), test_spec,
+                          row_size=row_size,
+                          size=3,
+                          layout_offset=4,
+                          db_offset=2)
+        plc_data = bytearray(b'\xff\xff') + _bytearray * 3
+        plc_data[2 + row_size:4 + row_size] = b'\x00\x07'
+        client = FakeClient(plc_data)
+        test_db[0]['ID'] = 9
+        test_db.read(client)
+        self.assertEqual(client.reads, [(1, 2, row_size * 3)])
+        self.assertEqual(test_db[1]['ID'], 7)
+        self.assertEqual(test_db[2]['NAME'], 'test')
+        self.assertEqual(test_db._bytearray[:2], b'\x00\x00')
+        self.assertEqual(test_db.dirty_ranges(), [])
+
+        plc_data[2:4] = b'\x00\x03'
+        test_db[0].read(client)
+        self.assertEqual(client.reads[-1], (1, 2, row_size))
+        self.assertEqual(test_db[0]['ID'], 3)
+
+    def test_db_index(self):
+        row_size = len(_bytearray)
+        test_array = bytearray(_bytearray * 3)
+        for i in range(3):
+            util.set_int(test_array, i * row_size, i + 1)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=row_size,
+                          size=3,
+                          id_field='ID',
+                          layout_offset=4,
+                          db_offset=0)
+        self.assertEqual(list(test_db.index), [1, 2, 3])
+        self.assertTrue(test_db[2] is test_db.rows[1])
+
+        # setters update the index
+        test_db[2]['ID'] = 7
+        self.assertEqual(list(test_db.index), [1, 7, 3])
+        self.assertTrue(test_db[7] is test_db.rows[1])
+        self.assertEqual(test_db[2], None)
+
+        # so does new data
+        new_data = bytearray(test_array)
+        util.set_int(new_data, 2 * row_size, 9)
+        test_db.set_data(new_data)
+        self.assertEqual(list(test_db.index), [1, 7, 9])
+
+        plc_data = bytearray(new_data)
+        util.set_int(plc_data, 0, 4)
+        test_db.read(FakeClient(plc_data))
+        self.assertEqual(list(test_db.index), [4, 7, 9])
+
+    def test_lazy_db(self):
+        row_size = len(_bytearray)
+        test_array = bytearray(_bytearray * 10)
+        for i in range(10):
+            util.set_int(test_array, i * row_size, i + 1)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=row_size,
+                          size=10,
+                          layout_offset=4,
+                          db_offset=0,
+                          lazy=True,
+                          cache_size=3)
+        self.assertEqual(len(test_db._cache), 0)
+        self.assertEqual(len(test_db), 10)
+        self.assertEqual(test_db[4]['ID'], 5)
+        self.assertEqual(test_db[10], None)
+        self.assertTrue(test_db[4] is test_db.row(4))
+        for i in range(10):
+            test_db[i]['testReal'] = i
+        self.assertEqual(list(test_db._cache), [7, 8, 9])
+        self.assertEqual([row['testReal'] for i, row in test_db],
+                         list(range(10)))
+        self.assertRaises(IndexError, test_db.row, 10)
+        self.assertRaises(AttributeError, setattr, test_db[0], 'x', 1)
+
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=row_size,
+                          size=10,
+                          id_field='ID',
+                          layout_offset=4,
+                          db_offset=0,
+                          lazy=True,
+                          cache_size=3)
+        self.assertEqual(test_db[7].db_offset, 6 * row_size)
+        self.assertEqual(list(test_db.index), list(range(1, 11)))
+
+    def test_secondary_index(self):
+        row_size = len(_bytearray)
+        test_db = util.DB(1, bytearray(_bytearray * 3), test_spec,
+                          row_size=row_size,
+                          size=3,
+                          layout_offset=4,
+                          db_offset=0)
+        test_db.add_index('NAME')
+        test_db[1]['NAME'] = 'abc'
+        self.assertEqual(test_db.lookup('NAME', 'test'),
+                         [test_db.rows[0], test_db.rows[2]])
+        self.assertEqual(test_db.lookup('NAME', 'abc'), [test_db.rows[1]])
+        self.assertEqual(test_db.lookup('NAME', 'xyz'), [])
+
+        # only rows with changed key bytes are decoded again
+        index = test_db.indexes['NAME']
+        decoded = []
+        field = index.field
+
+        class Field(object):
+            byte_index = field.byte_index
+            size = field.size
+
+            def get(self, data, offset):
+                decoded.append(offset)
+                return field.get(data, offset)
+
+        index.field = Field()
+        test_db[0]['ID'] = 3
+        test_db[2]['NAME'] = 'xyz'
+        self.assertEqual(test_db.lookup('NAME', 'xyz'), [test_db.rows[2]])
+        self.assertEqual(decoded, [2 * row_size - 4])
+        self.assertRaises(KeyError, test_db.lookup, 'ID', 3)
+
+    def test_index_key_changes(self):
+        test_array = bytearray(8)
+        util.set_int(test_array, 0, 1)
+        util.set_int(test_array, 4, 2)
+        test_db = util.DB(1, test_array, "0 id INT\n2 v INT\n", row_size=4,
+                          size=2, id_field='id')
+        self.assertEqual(test_db[2].db_offset, 4)
+        # row setters of the key field update the index
+        test_db[2]['id'] = 7
+        self.assertEqual(test_db[7].db_offset, 4)
+        self.assertEqual(test_db[2], None)
+        test_db.rows[0].set_value(0, 'INT', 5)
+        self.assertEqual(test_db[5].db_offset, 0)
+        # direct buffer changes need an invalidate()
+        util.set_int(test_array, 4, 9)
+        self.assertEqual(test_db[9], None)
+        test_db.invalidate(4, 6)
+        self.assertEqual(test_db[9].db_offset, 4)
+        self.assertEqual(test_db[7], None)
+
+    def test_flush_row_offset(self):
+        test_array = bytearray(_bytearray)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=len(_bytearray),
+                          size=1,
+                          layout_offset=4,
+                          db_offset=0,
+                          row_offset=4)
+        test_db[0]['ID'] = 5
+        self.assertEqual(test_db.dirty_ranges(), [])
+        test_db[0]['NAME'] = 'abc'
+        self.assertEqual(test_db.dirty_ranges(), [(4, 4)])
+
+    def test_dirty_gap(self):
+        test_db = util.DB(1, bytearray(_bytearray), test_spec,
+                          row_size=len(_bytearray),
+                          size=1,
+                          layout_offset=4,
+                          db_offset=0)
+        test_db[0]['ID'] = 5
+        test_db[0]['testReal'] = 1.0
+        self.assertEqual(test_db.dirty_ranges(), [(0, 2), (9, 4)])
+        self.assertEqual(test_db.dirty_ranges(max_gap=7), [(0, 13)])
+        self.assertEqual(test_db.dirty_ranges(max_gap=6), [(0, 2), (9, 4)])
+
+    def test_flush_from_offset(self):
+        test_db = util.DB(1, bytearray(40), "0 a INT\n", row_size=2,
+                          size=20)
+        test_db.mark_dirty(5, 10)
+        client = FakeClient()
+        test_db.flush(client, start=10)
+        self.assertEqual([(tag[2], len(tag[3])) for tag in client.writes[0]],
+                         [(10, 5)])
+        # the part before the flushed range is still to be written
+        self.assertEqual(test_db.dirty_ranges(), [(5, 5)])
+        test_db.flush(client, start=10, end=40)
+        self.assertEqual(test_db.dirty_ranges(), [(5, 5)])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_as_array(self):
+        test_array = bytearray(_bytearray * 3)
+        test_db = util.DB(1, test_array, test_spec,
+                          row_size=len(_bytearray),
+                          size=3,
+                          layout_offset=4,
+                          db_offset=0)
+        test_db[1]['ID'] = 5
+        test_db[2]['testbool1'] = 0
+        array = test_db.as_array()
+        self.assertEqual(list(array['ID']), [0, 5, 0])
+        self.assertEqual(list(test_db.column('testbool1')),
+                         [True, True, False])
+        self.assertEqual(list(test_db.column('NAME')), ['test'] * 3)
+        self.assertAlmostEqual(test_db.column('testReal')[0], 827.3, 2)
+        self.assertEqual(list(test_db.column('testDword')), [4294967295] * 3)
+
+        # the array is a view on the DB data
+        array['ID'][2] = 9
+        self.assertEqual(test_db[2]['ID'], 9)
+
+
+class FakeClient(object):
+    """
+    Records the write_tags() calls of a DB and serves reads from ``data``.
+    """
+    def __init__(self, data=None):
+        self.writes = []
+        self.reads = []
+        self.result = 0
+        self.data = data
+
+    def db_read_into(self, buffer, db_number, start, size=None, offset=0):
+        # fill the buffer through ctypes, like the library
+        cdata, size = byte_buffer(buffer, size, offset)
+        self.reads.append((db_number, start, size))
+        ctypes.memmove(cdata, bytes(self.data[start:start + size]), size)
+        return size
+
+    def write_tags(self, tags):
+        self.writes.append(tags)
+        return [self.result] * len(tags)
+
 
 def print_row(data):
     """print a single db row in chr and str